@@ -10,28 +10,53 @@ draws black boxes over matches, and reassembles into a new PDF.
 from __future__ import annotations
 
 import argparse
+import functools
 import gc
 import glob
+import io
+import itertools
 import logging
 import math
 import os
 import re
 import sys
-import tempfile
-from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import dataclass, replace
 from typing import TYPE_CHECKING, NoReturn
 
-import fitz
-import pytesseract
 import yaml
+from parsimonious.expressions import (
+    Compound,
+    Expression,
+    Literal,
+    Lookahead,
+    OneOf,
+    Quantifier,
+    Regex,
+    Sequence,
+)
 from parsimonious.grammar import Grammar
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageOps
 from platformdirs import site_config_dir, user_config_dir
-from reportlab.pdfgen import canvas
 
+# PyMuPDF and pytesseract are imported where they're used, so that --help,
+# --version and config errors don't pay for loading them
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    import fitz
     from parsimonious.nodes import Node
+    from tesserocr import PyTessBaseAPI
 
 __version__ = "0.1.0"
 
@@ -103,6 +128,7 @@ class JobResult:
     leaked: int  # 0 if verification passed or was skipped
     error_code: int = EXIT_SUCCESS
     retried_dpi: int | None = None  # DPI used on retry, or None if no retry
+    error: str | None = None  # Why the file couldn't be processed (EXIT_FILE_ERROR)
 
 
 @dataclass(frozen=True)
@@ -110,8 +136,19 @@ class Config:
     """Configuration for PDF processing."""
 
     dpi: int = 300
+    ocr_dpi: int | None = None  # resolution pages are OCR'd at (None: same as dpi)
     lang: str = "eng"
     verify: bool = True
+    page_jobs: int = 1  # worker processes for per-page OCR and redaction
+    keep_unredacted: bool = False  # copy pages without matches from the input as-is
+    jpeg_quality: int | None = None  # embed output pages as JPEG (None: lossless)
+    grayscale: bool = False  # render, OCR and store pages in grayscale
+    crop_margins: bool = False  # render only the part of each page with something on it
+    psm: int | None = None  # Tesseract page segmentation mode (None: Tesseract's default)
+
+    @property
+    def effective_ocr_dpi(self) -> int:
+        return self.ocr_dpi or self.dpi
 
 
 # =============================================================================
@@ -119,9 +156,26 @@ class Config:
 # =============================================================================
 
 
+class _AlnumTable(dict):
+    """str.translate table that deletes non-alphanumeric code points, filled in on demand."""
+
+    def __missing__(self, codepoint: int) -> int | None:
+        value = codepoint if chr(codepoint).isalnum() else None
+        self[codepoint] = value
+        return value
+
+
+_ALNUM_TABLE = _AlnumTable()
+
+
+@functools.lru_cache(maxsize=65536)
 def normalize(text: str) -> str:
-    """Strip everything except alphanumeric characters (Unicode-aware)."""
-    return "".join(c for c in text if c.isalnum())
+    """
+    Strip everything except alphanumeric characters (Unicode-aware).
+
+    Cached, since OCR output repeats the same words ("the", headers, form labels).
+    """
+    return text.translate(_ALNUM_TABLE)
 
 
 def build_stream(words: list[Word]) -> TextStream:
@@ -147,63 +201,379 @@ def build_stream(words: list[Word]) -> TextStream:
 # =============================================================================
 
 
-def ocr_page(img: Image.Image, config: Config) -> list[Word]:
-    """Extract words with bounding boxes from an image using Tesseract."""
-    data = pytesseract.image_to_data(img, lang=config.lang, output_type=pytesseract.Output.DICT)
+@functools.cache
+def _tesserocr_api(lang: str, psm: int | None = None) -> PyTessBaseAPI | None:
+    """
+    Return this process's in-process Tesseract API for a language and page
+    segmentation mode.
+
+    Returns None if the optional tesserocr package isn't installed. Imported lazily
+    so OMP_THREAD_LIMIT is already set when Tesseract initializes.
+    """
+    try:
+        from tesserocr import PyTessBaseAPI
+    except ImportError:
+        return None
+    if psm is None:
+        return PyTessBaseAPI(lang=lang)
+    return PyTessBaseAPI(lang=lang, psm=psm)
+
+
+def _parse_tsv(tsv: str) -> list[Word]:
+    """
+    Parse Tesseract's TSV output (without header row) into words.
+
+    Only the five columns we use are converted, in a single pass over the rows.
+    """
     words: list[Word] = []
 
-    for i in range(len(data["text"])):
-        text = data["text"][i].strip()
+    for line in tsv.splitlines():
+        fields = line.split("\t")
+        if len(fields) < 12:
+            continue
+        text = fields[11].strip()
         if text:
             words.append(
                 Word(
                     text=text,
-                    left=data["left"][i],
-                    top=data["top"][i],
-                    width=max(1, data["width"][i]),
-                    height=max(1, data["height"][i]),
+                    left=int(fields[6]),
+                    top=int(fields[7]),
+                    width=max(1, int(fields[8])),
+                    height=max(1, int(fields[9])),
                 )
             )
 
     return words
 
 
+def ocr_page(img: Image.Image, config: Config) -> list[Word]:
+    """
+    Extract words with bounding boxes from an image using Tesseract.
+
+    Uses tesserocr when installed, which keeps Tesseract and its language models
+    loaded between pages instead of starting a tesseract process per page.
+    """
+    api = _tesserocr_api(config.lang, config.psm)
+    if api is not None:
+        api.SetImage(img)
+        try:
+            return _parse_tsv(api.GetTSVText(0))
+        finally:
+            # Free the page image and recognition results now, not at the next page
+            api.Clear()
+
+    import pytesseract
+
+    tsv = pytesseract.image_to_data(
+        img,
+        lang=config.lang,
+        config=f"--psm {config.psm}" if config.psm is not None else "",
+        output_type=pytesseract.Output.STRING,
+    )
+    _, _, rows = tsv.partition("\n")  # drop the header row
+    return _parse_tsv(rows)
+
+
 # =============================================================================
 # Pattern Matching
 # =============================================================================
 
 
-def compile_grammars(patterns: list[str]) -> list[Grammar]:
-    """Compile PEG patterns into Grammar objects, warning on invalid patterns."""
-    grammars: list[Grammar] = []
+@dataclass(frozen=True)
+class CompiledGrammar:
+    """A compiled PEG pattern with a prefilter for where its matches can start."""
+
+    grammar: Grammar
+    # Equivalent regular expression, used instead of the grammar when there is one
+    regex: re.Pattern[str] | None
+    # Every match starts with a match of one of these (None: could start anywhere)
+    leads: tuple[Expression, ...] | None
+    # No match can be shorter than this
+    min_length: int = 0
+    # Literals that appear in the text wherever the grammar matches
+    required: tuple[str, ...] = ()
+    # Lowercased ASCII text, when the grammar just matches it ignoring case (e.g. -m)
+    folded_literal: str | None = None
+
+
+def _leading_expressions(
+    expr: Expression, seen: frozenset[int] = frozenset()
+) -> tuple[Expression, ...] | None:
+    """
+    Find the literals and regexes that any match of an expression must start with.
+
+    Returns None when that can't be determined cheaply, e.g. when the expression
+    starts with an optional part or refers back to itself.
+    """
+    if id(expr) in seen:
+        return None
+    seen |= {id(expr)}
+
+    if isinstance(expr, (Literal, Regex)):
+        return (expr,)
+    if isinstance(expr, Sequence):
+        for member in expr.members:
+            # A negative lookahead consumes nothing; the match starts with what follows
+            if isinstance(member, Lookahead) and member.negativity:
+                continue
+            return _leading_expressions(member, seen)
+        return None
+    if isinstance(expr, OneOf):
+        leads: list[Expression] = []
+        for member in expr.members:
+            member_leads = _leading_expressions(member, seen)
+            if member_leads is None:
+                return None
+            leads.extend(member_leads)
+        return tuple(leads)
+    if isinstance(expr, Lookahead) and not expr.negativity:
+        return _leading_expressions(expr.members[0], seen)
+    if isinstance(expr, Quantifier) and expr.min >= 1:
+        return _leading_expressions(expr.members[0], seen)
+    return None
+
+
+def _min_length(expr: Expression, seen: frozenset[int] = frozenset()) -> int:
+    """Return a lower bound on the length of any match of an expression."""
+    if id(expr) in seen:
+        return 0
+    seen |= {id(expr)}
+
+    if isinstance(expr, Literal):
+        return len(expr.literal)
+    if isinstance(expr, Sequence):
+        return sum(_min_length(member, seen) for member in expr.members)
+    if isinstance(expr, OneOf):
+        return min((_min_length(member, seen) for member in expr.members), default=0)
+    if isinstance(expr, Quantifier):
+        return expr.min * _min_length(expr.members[0], seen)
+    # Regexes and lookaheads: assume they may match the empty string
+    return 0
+
+
+def _required_literals(expr: Expression, seen: frozenset[int] = frozenset()) -> set[str]:
+    """Find literals that must occur in the text for an expression to match."""
+    if id(expr) in seen:
+        return set()
+    seen |= {id(expr)}
+
+    if isinstance(expr, Literal):
+        return {expr.literal} if expr.literal else set()
+    if isinstance(expr, Sequence):
+        return set().union(*(_required_literals(member, seen) for member in expr.members))
+    if isinstance(expr, OneOf):
+        member_sets = [_required_literals(member, seen) for member in expr.members]
+        return set.intersection(*member_sets) if member_sets else set()
+    if isinstance(expr, Lookahead) and not expr.negativity:
+        return _required_literals(expr.members[0], seen)
+    if isinstance(expr, Quantifier) and expr.min >= 1:
+        return _required_literals(expr.members[0], seen)
+    return set()
+
+
+# Flags that carry over from a parsimonious Regex into a scoped (?flags:...) group
+_SCOPED_REGEX_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.ASCII, "a"))
+
+# Backreferences and conditionals refer to groups by number, which shift when combined
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# Inline flags that apply to a whole pattern, e.g. the (?i) in ~"(?i)johndoe"
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _scoped_source(regex: re.Pattern[str]) -> str | None:
+    """
+    Rewrite a parsimonious regex as a (?flags:...) group for embedding in a larger regex.
+
+    Returns None for regexes that would behave differently once embedded.
+    """
+    if regex.flags & re.VERBOSE or _GROUP_REFERENCE.search(regex.pattern):
+        return None
+    # Leading inline flags are already in regex.flags; any others can't be scoped
+    leading = _GLOBAL_FLAGS.match(regex.pattern)
+    pattern = regex.pattern[leading.end() :] if leading else regex.pattern
+    if _GLOBAL_FLAGS.search(pattern):
+        return None
+    flags = "".join(letter for flag, letter in _SCOPED_REGEX_FLAGS if regex.flags & flag)
+    return f"(?{flags}:{pattern})"
+
+
+def _regex_source(expr: Expression, seen: frozenset[int] = frozenset()) -> str | None:
+    """
+    Translate an expression into regex source that matches exactly what it does.
+
+    PEG choices and repetitions never backtrack, so they become atomic groups and
+    possessive quantifiers. Returns None for expressions that can't be translated,
+    such as recursive rules.
+    """
+    if id(expr) in seen:
+        return None
+    seen |= {id(expr)}
+
+    if isinstance(expr, Literal):
+        return re.escape(expr.literal)
+    if isinstance(expr, Regex):
+        scoped = _scoped_source(expr.re)
+        return None if scoped is None else f"(?>{scoped})"
+    if not isinstance(expr, Compound):
+        return None
+
+    members = [_regex_source(member, seen) for member in expr.members]
+    if None in members:
+        return None
+    if isinstance(expr, Sequence):
+        return "(?:" + "".join(members) + ")"
+    if isinstance(expr, OneOf):
+        return "(?>" + "|".join(members) + ")"
+    if isinstance(expr, Lookahead):
+        return ("(?!" if expr.negativity else "(?=") + members[0] + ")"
+    if isinstance(expr, Quantifier):
+        maximum = "" if expr.max == float("inf") else str(expr.max)
+        # Like parsimonious, stop repeating at the end of the text
+        return f"(?:(?!\\Z){members[0]}){{{expr.min},{maximum}}}+"
+    return None
+
+
+# A regex body made only of plain characters and escaped punctuation
+_LITERAL_REGEX = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])+", re.DOTALL)
+
+
+def _folded_literal(rule: Expression) -> str | None:
+    """
+    Return the lowercased text of a rule like ~"johndoe"i, if it's ASCII.
+
+    In ASCII text, such a rule matches exactly where the lowercased text contains
+    this, which str.find locates much faster than a case-insensitive regex search.
+    """
+    if not isinstance(rule, Regex) or not rule.re.flags & re.IGNORECASE:
+        return None
+    if rule.re.flags & re.VERBOSE:
+        return None
+
+    leading = _GLOBAL_FLAGS.match(rule.re.pattern)
+    body = rule.re.pattern[leading.end() :] if leading else rule.re.pattern
+    if not _LITERAL_REGEX.fullmatch(body):
+        return None
+
+    literal = re.sub(r"\\(.)", r"\1", body, flags=re.DOTALL)
+    return literal.lower() if literal.isascii() else None
+
+
+def _compile_regex(rule: Expression) -> re.Pattern[str] | None:
+    """Compile a regex equivalent to a grammar's default rule, if there is one."""
+    if isinstance(rule, Regex):
+        return rule.re
+    if isinstance(rule, Literal):
+        return re.compile(re.escape(rule.literal))
+    # Atomic groups and possessive quantifiers need Python 3.11
+    if sys.version_info < (3, 11):
+        return None
+
+    source = _regex_source(rule)
+    if source is None:
+        return None
+    try:
+        return re.compile(source)
+    except re.error:
+        return None
+
+
+def compile_grammars(patterns: list[str]) -> list[CompiledGrammar]:
+    """Compile PEG patterns into CompiledGrammar objects, warning on invalid patterns."""
+    grammars: list[CompiledGrammar] = []
 
     for pattern in patterns:
         try:
-            grammars.append(Grammar(pattern))
+            grammar = Grammar(pattern)
         except Exception as e:
             # Only log in main process (workers don't have logging configured)
             if log.handlers:
                 log.warning("Invalid grammar: %s (%s)", pattern.strip()[:50], e)
+            continue
+
+        rule = grammar.default_rule
+        if rule is None:
+            grammars.append(CompiledGrammar(grammar=grammar, regex=None, leads=None))
+            continue
+        grammars.append(
+            CompiledGrammar(
+                grammar=grammar,
+                regex=_compile_regex(rule),
+                leads=_leading_expressions(rule),
+                min_length=_min_length(rule),
+                required=tuple(sorted(_required_literals(rule))),
+                folded_literal=_folded_literal(rule),
+            )
+        )
 
     return grammars
 
 
-def find_matches(stream: TextStream, grammars: list[Grammar]) -> set[int]:
+def _candidate_starts(text: str, leads: tuple[Expression, ...] | None) -> Iterable[int]:
+    """
+    Return the positions in text where a grammar with these leads could match.
+
+    Uses str.find and re.search, which scan in C, instead of trying the grammar
+    at every position.
+    """
+    if leads is None:
+        return range(len(text))
+
+    starts: set[int] = set()
+    for lead in leads:
+        if isinstance(lead, Literal):
+            pos = text.find(lead.literal)
+            while 0 <= pos < len(text):
+                starts.add(pos)
+                pos = text.find(lead.literal, pos + 1)
+        else:
+            m = lead.re.search(text)
+            while m and m.start() < len(text):
+                starts.add(m.start())
+                m = lead.re.search(text, m.start() + 1)
+
+    return sorted(starts)
+
+
+def find_matches(stream: TextStream, grammars: list[CompiledGrammar]) -> set[int]:
     """
     Find all pattern matches in the text stream.
 
     Returns the set of word indices that are part of any match.
     """
     matched_words: set[int] = set()
-
-    for grammar in grammars:
-        for start in range(len(stream.text)):
+    # Lowercased once for all case-insensitive literals; only valid for ASCII text
+    lowered = stream.text.lower() if stream.text.isascii() else None
+
+    for compiled in grammars:
+        # Skip grammars that can't match anywhere in this text
+        if len(stream.text) < compiled.min_length:
+            continue
+        if not all(literal in stream.text for literal in compiled.required):
+            continue
+
+        if compiled.folded_literal and lowered is not None:
+            length = len(compiled.folded_literal)
+            pos = lowered.find(compiled.folded_literal)
+            while pos >= 0:
+                matched_words.update(stream.word_map[pos : pos + length])
+                pos = lowered.find(compiled.folded_literal, pos + 1)
+            continue
+
+        if compiled.regex is not None:
+            # Searching from just past each match start finds overlapping matches too
+            m = compiled.regex.search(stream.text)
+            while m and m.start() < len(stream.text):
+                matched_words.update(stream.word_map[m.start() : m.end()])
+                m = compiled.regex.search(stream.text, m.start() + 1)
+            continue
+
+        for start in _candidate_starts(stream.text, compiled.leads):
             try:
-                node: Node | None = grammar.match(stream.text, start)
+                node: Node | None = compiled.grammar.match(stream.text, start)
                 if node:
-                    for i in range(start, start + len(node.text)):
-                        if i < len(stream.word_map):
-                            matched_words.add(stream.word_map[i])
+                    # Slicing clamps to the stream, and update() adds the words in C
+                    matched_words.update(stream.word_map[start : start + len(node.text)])
             except Exception:
                 pass
 
@@ -226,25 +596,25 @@ def group_adjacent_words(matched_indices: set[int], words: list[Word]) -> list[l
 
     sorted_indices = sorted(matched_indices)
     groups: list[list[int]] = []
-    current_group = [sorted_indices[0]]
+    prev_idx = sorted_indices[0]
+    prev = words[prev_idx]
+    current_group = [prev_idx]
 
     for idx in sorted_indices[1:]:
-        prev_idx = current_group[-1]
-        prev = words[prev_idx]
         curr = words[idx]
 
         # Same line: vertical positions within 0.5x the height (strict to avoid cross-line grouping)
-        same_line = abs(prev.top - curr.top) < prev.height * 0.5
-
         # Adjacent: sequential indices or horizontally close
-        adjacent = idx == prev_idx + 1 or (curr.left - prev.right < 50)
-
-        if same_line and adjacent:
+        if abs(prev.top - curr.top) < prev.height * 0.5 and (
+            idx == prev_idx + 1 or curr.left - prev.right < 50
+        ):
             current_group.append(idx)
         else:
             groups.append(current_group)
             current_group = [idx]
 
+        prev_idx, prev = idx, curr
+
     groups.append(current_group)
     return groups
 
@@ -254,13 +624,22 @@ def compute_box(
 ) -> Box:
     """Compute the bounding box for a group of words, with padding."""
     img_w, img_h = img_size
-    group_words = [words[i] for i in indices]
+
+    # One pass over the group instead of one per edge
+    first = words[indices[0]]
+    left, top, right, bottom = first.left, first.top, first.right, first.bottom
+    for i in indices[1:]:
+        w = words[i]
+        left = min(left, w.left)
+        top = min(top, w.top)
+        right = max(right, w.right)
+        bottom = max(bottom, w.bottom)
 
     return Box(
-        left=max(0, min(w.left for w in group_words) - pad),
-        top=max(0, min(w.top for w in group_words) - pad),
-        right=min(img_w, max(w.right for w in group_words) + pad),
-        bottom=min(img_h, max(w.bottom for w in group_words) + pad),
+        left=max(0, left - pad),
+        top=max(0, top - pad),
+        right=min(img_w, right + pad),
+        bottom=min(img_h, bottom + pad),
     )
 
 
@@ -269,40 +648,114 @@ def compute_box(
 # =============================================================================
 
 
-def draw_redactions(img: Image.Image, boxes: list[Box]) -> Image.Image:
-    """Draw black rectangles over the specified regions."""
-    img = img.copy()
+def _draw_redactions(img: Image.Image, boxes: list[Box]) -> None:
+    """Draw black rectangles over the specified regions, in place."""
     draw = ImageDraw.Draw(img)
 
     for box in boxes:
         draw.rectangle(box.as_tuple(), fill="black")
 
+
+def draw_redactions(img: Image.Image, boxes: list[Box]) -> Image.Image:
+    """Draw black rectangles over the specified regions."""
+    img = img.copy()
+    _draw_redactions(img, boxes)
     return img
 
 
-def redact_image(
-    img: Image.Image, grammars: list[Grammar], config: Config
-) -> tuple[Image.Image, int]:
+def _scale_words(words: list[Word], factor: float) -> list[Word]:
+    """Scale word boxes by a factor, rounding outward so they still cover the word."""
+    scaled: list[Word] = []
+    for w in words:
+        left = math.floor(w.left * factor)
+        top = math.floor(w.top * factor)
+        scaled.append(
+            Word(
+                text=w.text,
+                left=left,
+                top=top,
+                width=math.ceil(w.right * factor) - left,
+                height=math.ceil(w.bottom * factor) - top,
+            )
+        )
+    return scaled
+
+
+def _ocr_image(img: Image.Image, config: Config) -> list[Word]:
     """
-    Redact PII from a single image.
+    OCR an image rendered at config.dpi, resampling it to config.ocr_dpi first.
 
-    Returns (redacted_image, number_of_redactions).
+    Word boxes are returned in the coordinates of the original image.
     """
-    words = ocr_page(img, config)
+    ocr_dpi = config.effective_ocr_dpi
+    if ocr_dpi == config.dpi:
+        return ocr_page(img, config)
+
+    scale = ocr_dpi / config.dpi
+    width, height = img.size
+    resized = img.resize((max(1, round(width * scale)), max(1, round(height * scale))))
+    words = ocr_page(resized, config)
+    resized.close()
+    return _scale_words(words, 1 / scale)
+
+
+def _redaction_boxes(
+    img: Image.Image, grammars: list[CompiledGrammar], config: Config
+) -> list[Box]:
+    """OCR an image and return the boxes covering its pattern matches."""
+    words = _ocr_image(img, config)
     if not words:
-        return img, 0
+        return []
 
     stream = build_stream(words)
     matched = find_matches(stream, grammars)
     if not matched:
-        return img, 0
+        return []
 
     groups = group_adjacent_words(matched, words)
-    boxes = [compute_box(words, group, img.size) for group in groups]
+    return [compute_box(words, group, img.size) for group in groups]
+
+
+def redact_image(
+    img: Image.Image, grammars: list[CompiledGrammar], config: Config
+) -> tuple[Image.Image, int]:
+    """
+    Redact PII from a single image.
 
+    Returns (redacted_image, number_of_redactions). The image is only copied if
+    something is redacted; otherwise it is returned as is.
+    """
+    boxes = _redaction_boxes(img, grammars, config)
+    if not boxes:
+        return img, 0
     return draw_redactions(img, boxes), len(boxes)
 
 
+def _redact_image(img: Image.Image, grammars: list[CompiledGrammar], config: Config) -> int:
+    """Redact PII from a single image in place, returning the number of redactions."""
+    boxes = _redaction_boxes(img, grammars, config)
+    _draw_redactions(img, boxes)
+    return len(boxes)
+
+
+def count_matches(img: Image.Image, grammars: list[CompiledGrammar], config: Config) -> int:
+    """
+    Count the pattern matches visible in an image, without redacting it.
+
+    Adjacent matched words count once, as they would be covered by one box.
+    """
+    words = _ocr_image(img, config)
+    if not words:
+        return 0
+
+    stream = build_stream(words)
+    matched = find_matches(stream, grammars)
+    if not matched:
+        return 0
+
+    return len(group_adjacent_words(matched, words))
+
+
 # =============================================================================
 # PDF Operations
 # =============================================================================
@@ -320,140 +773,408 @@ def _max_pixels_for_doc(doc: fitz.Document, dpi: int) -> int:
     return max_pixels
 
 
-def render_page(page: fitz.Page, dpi: int) -> Image.Image:
-    """Render a PDF page to a PIL Image."""
-    pix = page.get_pixmap(dpi=dpi)
-    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-    # Explicitly free the pixmap to release memory immediately
-    pix = None  # noqa: F841
-    return img
+# Points kept around the content found by _content_clip
+_CLIP_PADDING = 4
 
 
-def images_to_pdf(images: list[Image.Image], output_path: str, dpi: int) -> None:
-    """Assemble images into a PDF at the specified DPI."""
-    c = canvas.Canvas(output_path)
+def _content_clip(page: fitz.Page, dpi: int) -> fitz.Rect | None:
+    """
+    Find the part of a page with anything drawn on it, from a cheap 72 DPI render.
 
-    for img in images:
-        px_w, px_h = img.size
-        pt_w = px_w * 72 / dpi
-        pt_h = px_h * 72 / dpi
-        c.setPageSize((pt_w, pt_h))
+    Any ink, however faint, leaves a pixel that isn't pure white at that resolution.
+    The clip is aligned to the pixel grid at dpi, so rendering it gives exactly the
+    pixels a full render would have there.
+    Returns None if the whole page should be rendered: it's rotated or blank.
+    """
+    import fitz
+
+    if page.rotation:
+        return None
+    # At 72 DPI, pixels and points coincide
+    pix = page.get_pixmap(dpi=72, colorspace=fitz.csGRAY, alpha=False)
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples, "raw", "L", 0, 1)
+    bbox = ImageOps.invert(img).getbbox()
+    if bbox is None:
+        return None
+    left, top, right, bottom = bbox
+    pixel = 72 / dpi
+    clip = fitz.Rect(
+        math.floor((left - _CLIP_PADDING) / pixel) * pixel,
+        math.floor((top - _CLIP_PADDING) / pixel) * pixel,
+        math.ceil((right + _CLIP_PADDING) / pixel) * pixel,
+        math.ceil((bottom + _CLIP_PADDING) / pixel) * pixel,
+    )
+    return clip & page.rect
 
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-            img.save(tmp, "PNG")
-            tmp_path = tmp.name
 
-        c.drawImage(tmp_path, 0, 0, pt_w, pt_h)
-        c.showPage()
-        os.unlink(tmp_path)
-        # Close image to free memory immediately
-        img.close()
+def _page_clips(doc: fitz.Document, config: Config) -> list[fitz.Rect | None]:
+    """Find each page's content clip with config.crop_margins, else render whole pages."""
+    if not config.crop_margins:
+        return [None] * len(doc)
+    return [_content_clip(page, config.dpi) for page in doc]
 
-    c.save()
 
+def _render_samples(
+    page: fitz.Page, dpi: int, grayscale: bool = False, clip: fitz.Rect | None = None
+) -> tuple[bytes, int, int, str]:
+    """
+    Render a PDF page, or just the clip of it, to raw samples that can be shipped
+    to a worker process.
 
-def redact_pdf(
-    input_path: str,
-    output_path: str,
-    grammars: list[Grammar],
-    config: Config,
-) -> int:
+    Returns (samples, width, height, PIL mode), where the mode is "L" or "RGB".
     """
-    Redact a PDF file.
+    import fitz
 
-    Returns the total number of redactions made.
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    pix = page.get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False, clip=clip)
+    # The pixmap is freed on return; only the bytes copy of its samples survives
+    return pix.samples, pix.width, pix.height, "L" if grayscale else "RGB"
+
+
+def _image_from_samples(samples: bytes, width: int, height: int, mode: str) -> Image.Image:
     """
-    doc = fitz.open(input_path)
+    Wrap raw samples in a PIL Image without copying them.
 
-    # Set pixel limit for this document to avoid decompression bomb warnings
-    old_limit = Image.MAX_IMAGE_PIXELS
-    Image.MAX_IMAGE_PIXELS = _max_pixels_for_doc(doc, config.dpi) + 1
+    The image is read-only until drawn on, at which point Pillow copies it.
+    """
+    return Image.frombuffer(mode, (width, height), samples, "raw", mode, 0, 1)
+
+
+def render_page(
+    page: fitz.Page, dpi: int, grayscale: bool = False, clip: fitz.Rect | None = None
+) -> Image.Image:
+    """Render a PDF page, or just the clip of it, to a PIL Image."""
+    return _image_from_samples(*_render_samples(page, dpi, grayscale, clip))
+
+
+def _insert_image_page(
+    out: fitz.Document,
+    img: Image.Image,
+    dpi: int,
+    jpeg_quality: int | None = None,
+    page_rect: fitz.Rect | None = None,
+    clip: fitz.Rect | None = None,
+) -> None:
+    """
+    Append a page showing an image at the specified DPI, then close the image.
+
+    With a jpeg_quality, the image is embedded as a JPEG instead of losslessly.
+    With a clip, the page is the size of page_rect, blank but for the image at clip.
+    """
+    import fitz
+
+    if clip is not None and page_rect is not None:
+        page = out.new_page(width=page_rect.width, height=page_rect.height)
+        rect = clip
+    else:
+        px_w, px_h = img.size
+        page = out.new_page(width=px_w * 72 / dpi, height=px_h * 72 / dpi)
+        rect = page.rect
+
+    if jpeg_quality is not None:
+        # MuPDF embeds JPEG data as-is, without decoding it again
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=jpeg_quality)
+        page.insert_image(rect, stream=buf.getvalue())
+    else:
+        # Insert the raw pixels; MuPDF compresses them when saving
+        colorspace = fitz.csGRAY if img.mode == "L" else fitz.csRGB
+        pix = fitz.Pixmap(colorspace, *img.size, img.tobytes(), 0)
+        page.insert_image(rect, pixmap=pix)
+    # Close image to free memory immediately
+    img.close()
+
+
+def _redacted_pages(
+    doc: fitz.Document,
+    grammars: list[CompiledGrammar],
+    config: Config,
+    executor: Executor | None,
+    counts: list[int],
+    clips: list[fitz.Rect | None],
+) -> Iterator[Image.Image | None]:
+    """
+    Render and redact the pages of a document one at a time.
+
+    Yields each redacted page image and appends its number of redactions to counts.
+    With config.keep_unredacted, yields None instead for pages without redactions.
+    With an executor, a bounded number of pages is in flight in its workers.
+    Only each page's clip (see _page_clips) is rendered.
+    """
+    for img in _render_and_redact(doc, grammars, config, executor, counts, clips):
+        if config.keep_unredacted and counts[-1] == 0:
+            img.close()
+            yield None
+        else:
+            yield img
 
-    try:
-        images: list[Image.Image] = []
-        total_redactions = 0
 
+def _render_and_redact(
+    doc: fitz.Document,
+    grammars: list[CompiledGrammar],
+    config: Config,
+    executor: Executor | None,
+    counts: list[int],
+    clips: list[fitz.Rect | None],
+) -> Iterator[Image.Image]:
+    """Yield each page of a document redacted, appending its redactions to counts."""
+    if executor is None:
         for page in doc:
-            img = render_page(page, config.dpi)
-            redacted, count = redact_image(img, grammars, config)
-            # Close original image if redaction created a copy
-            if redacted is not img:
-                img.close()
-            images.append(redacted)
-            total_redactions += count
+            img = render_page(page, config.dpi, config.grayscale, clips[page.number])
+            counts.append(_redact_image(img, grammars, config))
+            yield img
+        return
+
+    # MuPDF isn't thread-safe: render serially, then fan out OCR and matching
+    pending: deque[tuple[tuple[bytes, int, int, str], Future[tuple[bytes | None, int]]]]
+    pending = deque()
+    for page in doc:
+        rendered = _render_samples(page, config.dpi, config.grayscale, clips[page.number])
+        pending.append((rendered, executor.submit(_process_page, rendered, config)))
+        if len(pending) >= 2 * config.page_jobs:
+            yield _collect_page(*pending.popleft(), counts)
+
+    while pending:
+        yield _collect_page(*pending.popleft(), counts)
 
-        doc.close()
 
-        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-        images_to_pdf(images, output_path, config.dpi)
+def _collect_page(
+    rendered: tuple[bytes, int, int, str],
+    future: Future[tuple[bytes | None, int]],
+    counts: list[int],
+) -> Image.Image:
+    """Wait for a page submitted to _process_page and rebuild its image."""
+    samples, width, height, mode = rendered
+    redacted_samples, redactions = future.result()
+    counts.append(redactions)
+    return _image_from_samples(redacted_samples or samples, width, height, mode)
 
-        return total_redactions
-    finally:
-        Image.MAX_IMAGE_PIXELS = old_limit
 
+def _open_pdf(source: str | fitz.Document) -> AbstractContextManager[fitz.Document]:
+    """Open a PDF by path, closing it afterwards; an already open document stays open."""
+    import fitz
+
+    if isinstance(source, str):
+        return fitz.open(source)
+    return nullcontext(source)
+
+
+def _write_page(
+    out: fitz.Document,
+    doc: fitz.Document,
+    page_num: int,
+    img: Image.Image | None,
+    config: Config,
+    clip: fitz.Rect | None,
+) -> None:
+    """Append a page to the output: the image, or with None the input page unchanged."""
+    if img is None:
+        out.insert_pdf(doc, from_page=page_num, to_page=page_num)
+    else:
+        page_rect = doc[page_num].rect
+        _insert_image_page(out, img, config.dpi, config.jpeg_quality, page_rect, clip)
 
-def scan_pdf(input_path: str, grammars: list[Grammar], config: Config) -> int:
+
+def redact_pdf(
+    input_path: str | fitz.Document,
+    output_path: str,
+    grammars: list[CompiledGrammar],
+    config: Config,
+    executor: Executor | None = None,
+    write_unredacted: bool = True,
+) -> int:
     """
-    Scan a PDF for pattern matches without redacting.
+    Redact a PDF file.
+
+    Pages stream from rendering through redaction into the output one at a time.
+    With config.keep_unredacted, pages without redactions are copied from the input
+    unchanged, text layer included.
+    With config.crop_margins, only the part of each page with something drawn on it
+    is rendered and OCR'd, and the rest of the output page is left blank.
+    If an executor is given, pages are OCR'd and redacted in its workers, which must
+    have been initialized by _init_page_worker with the same patterns.
+    Without write_unredacted, no output is written if nothing was redacted, and
+    none is built until a page is.
+    input_path may also be an open document, which is left open.
 
-    Returns the number of matches found (used for verification).
+    Returns the total number of redactions made.
     """
-    doc = fitz.open(input_path)
+    import fitz
 
-    # Set pixel limit for this document to avoid decompression bomb warnings
-    old_limit = Image.MAX_IMAGE_PIXELS
-    Image.MAX_IMAGE_PIXELS = _max_pixels_for_doc(doc, config.dpi) + 1
+    with _open_pdf(input_path) as doc:
+        # Set pixel limit for this document to avoid decompression bomb warnings
+        old_limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = _max_pixels_for_doc(doc, config.dpi) + 1
 
-    try:
-        total_matches = 0
+        try:
+            counts: list[int] = []
+            clips = _page_clips(doc, config)
+            pages = _redacted_pages(doc, grammars, config, executor, counts, clips)
+
+            out: fitz.Document | None = None
+            for page_num, img in enumerate(pages):
+                if out is None:
+                    if not (write_unredacted or counts[page_num]):
+                        # Nothing to write, at least until a page is redacted
+                        if img is not None:
+                            img.close()
+                        continue
+                    out = fitz.open()
+                    # Earlier pages were skipped with nothing to redact: render them
+                    # again as they were
+                    for clean_num in range(page_num):
+                        clean = None
+                        if not config.keep_unredacted:
+                            clean = render_page(
+                                doc[clean_num], config.dpi, config.grayscale, clips[clean_num]
+                            )
+                        _write_page(out, doc, clean_num, clean, config, clips[clean_num])
+                _write_page(out, doc, page_num, img, config, clips[page_num])
+
+            if out is not None:
+                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+                out.save(output_path, deflate=True)
+                out.close()
+
+            return sum(counts)
+        finally:
+            Image.MAX_IMAGE_PIXELS = old_limit
+
+
+def scan_pdf(
+    input_path: str | fitz.Document,
+    grammars: list[CompiledGrammar],
+    config: Config,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Scan a PDF for pattern matches without redacting.
 
-        for page in doc:
-            img = render_page(page, config.dpi)
-            words = ocr_page(img, config)
-            img.close()  # Free memory immediately after OCR
-            if not words:
-                continue
+    Returns the number of matches found (used to verify the saved output).
+    Pages are rendered straight at the OCR resolution, since nothing is drawn on them.
+    If an executor is given, pages are OCR'd in its workers (see redact_pdf).
+    input_path may also be an open document, which is left open.
+    """
+    with _open_pdf(input_path) as doc:
+        dpi = config.effective_ocr_dpi
+        config = replace(config, dpi=dpi, ocr_dpi=None)
 
-            stream = build_stream(words)
-            matched = find_matches(stream, grammars)
-            if matched:
-                groups = group_adjacent_words(matched, words)
-                total_matches += len(groups)
+        # Set pixel limit for this document to avoid decompression bomb warnings
+        old_limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = _max_pixels_for_doc(doc, dpi) + 1
 
-        doc.close()
-        return total_matches
-    finally:
-        Image.MAX_IMAGE_PIXELS = old_limit
+        try:
+            total_matches = 0
+
+            clips = _page_clips(doc, config)
+            if executor is None:
+                for page in doc:
+                    img = render_page(page, dpi, config.grayscale, clips[page.number])
+                    total_matches += count_matches(img, grammars, config)
+                    img.close()  # Free memory immediately after OCR
+            else:
+                pending: deque[Future[int]] = deque()
+                for page in doc:
+                    rendered = _render_samples(page, dpi, config.grayscale, clips[page.number])
+                    pending.append(executor.submit(_scan_page, rendered, config))
+                    if len(pending) >= 2 * config.page_jobs:
+                        total_matches += pending.popleft().result()
+                total_matches += sum(future.result() for future in pending)
+
+            return total_matches
+        finally:
+            Image.MAX_IMAGE_PIXELS = old_limit
 
 
 # =============================================================================
 # Parallel Processing
 # =============================================================================
 
+# Per-process state for page workers, set once by _init_page_worker
+_page_grammars: list[CompiledGrammar] = []
 
-def _process_single_pdf(args: tuple[str, str, list[str], Config]) -> JobResult:
-    """
-    Worker function for parallel PDF processing.
+# Per-process state for file workers, set once by _init_file_worker
+_file_patterns: list[str] = []
+_file_config = Config()
 
-    Takes a tuple of (input_path, output_path, patterns, config).
-    Compiles grammars in this process since Grammar objects can't be pickled.
 
-    If no matches are found at the initial DPI, retries at 2x DPI.
-    """
-    input_path, output_path, patterns, config = args
+def _init_page_worker(patterns: list[str]) -> None:
+    """Initialize a page worker: low priority, one Tesseract thread, grammars compiled once."""
+    global _page_grammars
 
-    # Compile grammars in this worker process
-    grammars = compile_grammars(patterns)
+    _init_worker()
+    _limit_ocr_threads()
+    _page_grammars = compile_grammars(patterns)
 
-    # First attempt at base DPI
-    redactions = redact_pdf(input_path, output_path, grammars, config)
-    retried_dpi = None
 
-    # Retry at higher DPI if no matches found
+def _process_page(args: tuple[bytes, int, int, str], config: Config) -> tuple[bytes | None, int]:
+    """
+    Worker function for parallel page redaction.
+
+    Takes a page rendered by _render_samples, and the config it was rendered with
+    (the DPI changes between attempts).
+    Returns (redacted samples, redactions). Samples are None when nothing was
+    redacted, so unchanged pages aren't sent back through the pipe.
+    """
+    img = _image_from_samples(*args)
+    redactions = _redact_image(img, _page_grammars, config)
     if redactions == 0:
-        retried_dpi = config.dpi * 2
-        retry_config = replace(config, dpi=retried_dpi)
-        redactions = redact_pdf(input_path, output_path, grammars, retry_config)
+        return None, 0
+    return img.tobytes(), redactions
+
+
+def _scan_page(args: tuple[bytes, int, int, str], config: Config) -> int:
+    """Worker function for parallel verification: count the matches on a rendered page."""
+    img = _image_from_samples(*args)
+    return count_matches(img, _page_grammars, config)
+
+
+def _page_executor(patterns: list[str], config: Config) -> ProcessPoolExecutor | None:
+    """Create a page-level worker pool, or None if pages should be processed serially."""
+    if config.page_jobs <= 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=config.page_jobs,
+        initializer=_init_page_worker,
+        initargs=(patterns,),
+    )
+
+
+def process_pdf(
+    input_path: str,
+    output_path: str,
+    grammars: list[CompiledGrammar],
+    config: Config,
+    executor: Executor | None = None,
+) -> JobResult:
+    """
+    Redact and verify a single PDF with already-compiled grammars.
+
+    If no matches are found at the initial DPI, retries at 2x DPI.
+    If config.verify is set, the saved output is read back and scanned at the DPI
+    it was made with, so anything that went wrong writing it is caught too.
+    If an executor is given, pages are OCR'd in its workers (see redact_pdf).
+    """
+    import fitz
+
+    # Parse the input once for both attempts
+    with fitz.open(input_path) as doc:
+        # First attempt at base DPI; if it finds nothing, the retry writes the output
+        redactions = redact_pdf(
+            doc, output_path, grammars, config, executor, write_unredacted=False
+        )
+        retried_dpi = None
+        final_config = config
+
+        # Retry at higher DPI if no matches found
+        if redactions == 0:
+            retried_dpi = config.dpi * 2
+            final_config = replace(
+                config,
+                dpi=retried_dpi,
+                ocr_dpi=config.ocr_dpi * 2 if config.ocr_dpi else None,
+            )
+            redactions = redact_pdf(doc, output_path, grammars, final_config, executor)
 
     # Determine error code
     error_code = EXIT_SUCCESS
@@ -462,11 +1183,7 @@ def _process_single_pdf(args: tuple[str, str, list[str], Config]) -> JobResult:
     if redactions == 0:
         error_code = EXIT_NO_MATCHES
     elif config.verify:
-        if retried_dpi:
-            verify_config = replace(config, dpi=retried_dpi)
-        else:
-            verify_config = config
-        leaked = scan_pdf(output_path, grammars, verify_config)
+        leaked = scan_pdf(output_path, grammars, final_config, executor)
         if leaked > 0:
             error_code = EXIT_VERIFICATION_FAILED
 
@@ -483,11 +1200,116 @@ def _process_single_pdf(args: tuple[str, str, list[str], Config]) -> JobResult:
     )
 
 
-def get_worker_count(jobs_arg: int | None, num_jobs: int) -> int:
+@functools.lru_cache(maxsize=8)
+def _compiled_grammars(patterns: tuple[str, ...]) -> list[CompiledGrammar]:
+    """Compile patterns, reusing the result for later files with the same patterns."""
+    return compile_grammars(list(patterns))
+
+
+def _process_single_pdf(args: tuple[str, str, list[str], Config]) -> JobResult:
+    """
+    Worker function for parallel PDF processing.
+
+    Takes a tuple of (input_path, output_path, patterns, config).
+    Compiles grammars in this process since Grammar objects can't be pickled.
+
+    If config.page_jobs > 1, pages are OCR'd in a pool of that many processes.
+    """
+    input_path, output_path, patterns, config = args
+
+    # Compile grammars once per worker process, not once per file
+    grammars = _compiled_grammars(tuple(patterns))
+
+    executor = _page_executor(patterns, config)
+    with executor or nullcontext():
+        return process_pdf(input_path, output_path, grammars, config, executor)
+
+
+def _process_pdf_batch(paths: list[tuple[str, str]]) -> list[JobResult]:
+    """
+    Worker function for parallel batch processing.
+
+    Takes a chunk of (input_path, output_path) pairs; the patterns and config were
+    sent once per worker by _init_file_worker rather than with every file.
+    """
+    results: list[JobResult] = []
+    for input_path, output_path in paths:
+        try:
+            result = _process_single_pdf((input_path, output_path, _file_patterns, _file_config))
+        except Exception as e:
+            # Fail just this file, keeping the results for the rest of the chunk
+            result = _file_error(input_path, output_path, e)
+        results.append(result)
+    return results
+
+
+def _file_error(input_path: str, output_path: str, error: Exception) -> JobResult:
+    """Result for a file that couldn't be processed, e.g. because it isn't a valid PDF."""
+    return JobResult(
+        input_path=input_path,
+        output_path=output_path,
+        redactions=0,
+        leaked=0,
+        error_code=EXIT_FILE_ERROR,
+        error=f"{type(error).__name__}: {error}",
+    )
+
+
+def _file_size(path: str) -> int:
+    """Size of a file in bytes, or 0 if it can't be read (opening it reports why)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+# Largest input files whose pages _page_memory looks at
+_MEMORY_SAMPLE_FILES = 8
+
+
+def _available_memory() -> int | None:
+    """Memory available for new processes in bytes, or None if it can't be found."""
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _page_memory(paths: list[str], dpi: int, grayscale: bool) -> int:
+    """
+    Estimate the memory a worker needs for one page, in bytes.
+
+    Looks at the largest page of the given files (main passes the largest
+    _MEMORY_SAMPLE_FILES inputs), at twice the DPI since files without matches are
+    retried at that.
+    A worker holds about three copies of a page: the rendered samples, the image, and
+    its redacted copy.
+    """
+    import fitz
+
+    max_pixels = 0
+    for path in paths:
+        try:
+            with fitz.open(path) as doc:
+                max_pixels = max(max_pixels, _max_pixels_for_doc(doc, 2 * dpi))
+        except Exception:
+            # Reported when the file is processed
+            continue
+    return max_pixels * (1 if grayscale else 3) * 3
+
+
+def get_worker_count(jobs_arg: int | None, num_jobs: int, page_memory: int = 0) -> int:
     """
     Determine number of workers.
 
-    Default: half the CPU count.
+    Default: half the CPU count, and no more than fit in available memory when
+    page_memory (see _page_memory) is given.
     Clamped to: at least 1, at most the number of jobs.
     """
     cpu_count = os.cpu_count() or 1
@@ -495,6 +1317,9 @@ def get_worker_count(jobs_arg: int | None, num_jobs: int) -> int:
     if jobs_arg is None:
         # Default: half the cores
         workers = max(1, cpu_count // 2)
+        available = _available_memory() if page_memory else None
+        if available is not None:
+            workers = min(workers, available // page_memory)
     else:
         workers = jobs_arg
 
@@ -519,6 +1344,26 @@ def _init_worker() -> None:
         pass
 
 
+def _limit_ocr_threads() -> None:
+    """
+    Keep Tesseract to one OpenMP thread per process; parallelism comes from workers.
+
+    Sets both variables, since OpenMP runtimes differ in which one they honor.
+    Must run before Tesseract is first loaded in the process.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    os.environ["OMP_NUM_THREADS"] = "1"
+
+
+def _init_file_worker(patterns: list[str], config: Config) -> None:
+    """Initialize a file worker: low priority, with the batch's patterns and config."""
+    global _file_patterns, _file_config
+
+    _init_worker()
+    _file_patterns = patterns
+    _file_config = config
+
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -553,10 +1398,14 @@ def find_config(cli_path: str | None = None) -> str | None:
     return None
 
 
+# libyaml's C parser when PyYAML was built with it, else the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def load_patterns(path: str) -> list[str]:
     """Load pattern strings from a YAML config file."""
     with open(path) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YAML_LOADER)
     return [str(p) for p in config.get("patterns", [])]
 
 
@@ -565,18 +1414,29 @@ def load_patterns(path: str) -> list[str]:
 # =============================================================================
 
 
-def resolve_output(input_path: str, output_arg: str | None, base_dir: str | None = None) -> str:
+def is_output_dir(output_arg: str | None) -> bool:
+    """Whether the -o argument names a directory (the default output/ does)."""
+    return output_arg is None or output_arg.endswith("/") or os.path.isdir(output_arg)
+
+
+def resolve_output(
+    input_path: str,
+    output_arg: str | None,
+    base_dir: str | None = None,
+    is_dir: bool | None = None,
+) -> str:
     """
     Determine output path for a given input.
 
     If output_arg ends with / or is an existing directory, treat as directory.
     Otherwise treat as file path (only valid for single input).
+    Pass is_dir from is_output_dir to avoid checking the file system for every input.
     """
+    if is_dir is None:
+        is_dir = is_output_dir(output_arg)
     if output_arg is None:
         output_arg = "output/"
 
-    is_dir = output_arg.endswith("/") or os.path.isdir(output_arg)
-
     if is_dir:
         if base_dir:
             rel_path = os.path.relpath(input_path, base_dir)
@@ -587,6 +1447,52 @@ def resolve_output(input_path: str, output_arg: str | None, base_dir: str | None
         return output_arg
 
 
+def _scan_dir(path: str) -> tuple[list[str], list[str]]:
+    """
+    List a directory's subdirectories and PDFs.
+
+    Like glob's **, hidden entries are skipped and directory symlinks are followed.
+    Unreadable directories are treated as empty.
+    """
+    subdirs: list[str] = []
+    pdfs: list[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".pdf"):
+                    pdfs.append(entry.path)
+    except OSError:
+        pass
+    return subdirs, pdfs
+
+
+def _walk_for_pdfs(path: str) -> list[str]:
+    """Find the PDFs anywhere under a directory (see _scan_dir)."""
+    subdirs, pdfs = _scan_dir(path)
+    for subdir in subdirs:
+        pdfs.extend(_walk_for_pdfs(subdir))
+    return pdfs
+
+
+def _find_pdfs(root: str) -> list[str]:
+    """
+    Find the PDFs anywhere under a directory, walking its subdirectories in threads.
+
+    The threads spend most of their time in directory syscalls, which release the
+    GIL, so slow or networked file systems are walked with several requests in flight.
+    """
+    subdirs, pdfs = _scan_dir(root)
+    if subdirs:
+        with ThreadPoolExecutor(max_workers=min(8, len(subdirs))) as pool:
+            for found in pool.map(_walk_for_pdfs, subdirs):
+                pdfs.extend(found)
+    return pdfs
+
+
 def collect_inputs(args: list[str]) -> list[tuple[str, str | None]]:
     """
     Collect PDF files from input arguments.
@@ -601,8 +1507,7 @@ def collect_inputs(args: list[str]) -> list[tuple[str, str | None]]:
                 if p.endswith(".pdf"):
                     jobs.append((p, None))
         elif os.path.isdir(arg):
-            for p in glob.glob(f"{arg}/**/*.pdf", recursive=True):
-                jobs.append((p, arg))
+            jobs.extend((p, arg) for p in _find_pdfs(arg))
         elif arg.endswith(".pdf"):
             jobs.append((arg, None))
         else:
@@ -686,7 +1591,7 @@ Config file lookup order:
         "--jobs",
         type=int,
         metavar="N",
-        help="number of parallel workers (default: half of CPU cores)",
+        help="number of parallel workers; spare workers split up pages (default: half of CPU cores)",
     )
     parser.add_argument(
         "-q",
@@ -708,11 +1613,39 @@ Config file lookup order:
         metavar="DPI",
         help="resolution for rendering and output (default: 300)",
     )
+    parser.add_argument(
+        "--ocr-dpi",
+        type=int,
+        metavar="DPI",
+        help="resolution for text recognition (default: same as --dpi)",
+    )
     parser.add_argument(
         "--no-verify",
         action="store_true",
         help="skip re-scanning output to verify redaction (faster but less safe)",
     )
+    parser.add_argument(
+        "--grayscale",
+        action="store_true",
+        help="render and store pages in grayscale (smaller and faster)",
+    )
+    parser.add_argument(
+        "--jpeg",
+        type=int,
+        metavar="QUALITY",
+        dest="jpeg_quality",
+        help="store output pages as JPEG at this quality, 1-100 (default: lossless)",
+    )
+    parser.add_argument(
+        "--keep-unredacted-pages",
+        action="store_true",
+        help="copy pages without matches unchanged, keeping their text layer (less safe)",
+    )
+    parser.add_argument(
+        "--crop-margins",
+        action="store_true",
+        help="render and OCR only the part of each page with content; blank margins stay blank",
+    )
     parser.add_argument(
         "--lang",
         type=str,
@@ -720,6 +1653,20 @@ Config file lookup order:
         metavar="LANG",
         help="Tesseract language(s) for OCR, e.g. 'eng', 'eng+kor' (default: eng)",
     )
+    parser.add_argument(
+        "--psm",
+        type=int,
+        # 0 (orientation detection only) and 2 (layout without OCR) find no words at all
+        choices=[1, *range(3, 14)],
+        metavar="MODE",
+        help="Tesseract page segmentation mode, e.g. 6 for a single block of text "
+        "(default: Tesseract's automatic layout analysis)",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first file that fails verification",
+    )
     parser.add_argument(
         "--relaxed",
         action="store_true",
@@ -732,15 +1679,17 @@ Config file lookup order:
     )
 
     args = parser.parse_args()
+    if args.jpeg_quality is not None and not 1 <= args.jpeg_quality <= 100:
+        parser.error("--jpeg quality must be between 1 and 100")
     setup_logging(quiet=args.quiet, verbose=args.verbose)
 
     # Build patterns from CLI -m arguments
     patterns: list[str] = []
     if args.matches:
-        for text in args.matches:
-            # Escape special regex chars in the literal text
-            escaped = re.escape(text)
-            patterns.append(f'match = ~"{escaped}"i')
+        # Escape special regex chars in the literal text. Matching ignores case, so
+        # ASCII texts differing only in case would be the same grammar twice.
+        texts = {text.lower() if text.isascii() else text: text for text in args.matches}
+        patterns.extend(f'match = ~"{re.escape(text)}"i' for text in texts.values())
         log.debug("CLI patterns: %d", len(patterns))
 
     # Load patterns from config file (optional if -m provided)
@@ -767,7 +1716,7 @@ Config file lookup order:
         log.error("No patterns defined. Use -m or add patterns to config file.")
         sys.exit(EXIT_CONFIG_ERROR)
 
-    # Validate patterns by compiling in main process
+    # Compile in main process: validates patterns, and is reused for sequential processing
     grammars = compile_grammars(patterns)
     if not grammars:
         log.error("No valid patterns after compilation.")
@@ -780,38 +1729,70 @@ Config file lookup order:
         sys.exit(1)
 
     # Validate output for multiple inputs
-    if len(jobs) > 1 and args.output:
-        is_dir = args.output.endswith("/") or os.path.isdir(args.output)
-        if not is_dir:
-            log.error(
-                "Cannot output %d files to single file '%s'.\n"
-                "Use a directory (with trailing /) for multiple inputs.",
-                len(jobs),
-                args.output,
-            )
-            sys.exit(1)
+    output_is_dir = is_output_dir(args.output)
+    if len(jobs) > 1 and not output_is_dir:
+        log.error(
+            "Cannot output %d files to single file '%s'.\n"
+            "Use a directory (with trailing /) for multiple inputs.",
+            len(jobs),
+            args.output,
+        )
+        sys.exit(1)
 
-    # Build config and job arguments
-    config = Config(dpi=args.dpi, lang=args.lang, verify=not args.no_verify)
-    job_args: list[tuple[str, str, list[str], Config]] = []
-    for input_path, base_dir in jobs:
-        output_path = resolve_output(input_path, args.output, base_dir)
-        job_args.append((input_path, output_path, patterns, config))
+    # Largest files first: the memory estimate below looks at the biggest, and in
+    # parallel a big file picked up last doesn't leave the other workers idle
+    jobs.sort(key=lambda job: _file_size(job[0]), reverse=True)
 
-    # Determine parallelism
-    num_workers = get_worker_count(args.jobs, len(jobs))
+    # Determine parallelism: spare workers OCR pages of the same file in parallel.
+    # Every worker, for files or pages, holds a page at a time. Memory only limits
+    # the default worker count, and only matters if that's more than one.
+    page_memory = 0
+    if args.jobs is None and get_worker_count(None, os.cpu_count() or 1) > 1:
+        input_paths = [input_path for input_path, _ in jobs[:_MEMORY_SAMPLE_FILES]]
+        page_memory = _page_memory(input_paths, max(args.dpi, args.ocr_dpi or 0), args.grayscale)
+    num_workers = get_worker_count(args.jobs, len(jobs), page_memory)
+    page_jobs = max(1, get_worker_count(args.jobs, os.cpu_count() or 1, page_memory) // num_workers)
+
+    # Build config and job arguments
+    config = Config(
+        dpi=args.dpi,
+        ocr_dpi=args.ocr_dpi,
+        lang=args.lang,
+        verify=not args.no_verify,
+        page_jobs=page_jobs,
+        keep_unredacted=args.keep_unredacted_pages,
+        crop_margins=args.crop_margins,
+        psm=args.psm,
+        jpeg_quality=args.jpeg_quality,
+        grayscale=args.grayscale,
+    )
+    job_paths = [
+        (input_path, resolve_output(input_path, args.output, base_dir, output_is_dir))
+        for input_path, base_dir in jobs
+    ]
 
     # Limit Tesseract's internal threading to avoid oversubscription
-    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _limit_ocr_threads()
 
-    log.debug("Processing %d file(s) with %d worker(s)", len(jobs), num_workers)
+    log.debug(
+        "Processing %d file(s) with %d worker(s), %d page worker(s) each",
+        len(jobs),
+        num_workers,
+        page_jobs,
+    )
 
     # Process files
     verification_failures: list[tuple[str, int]] = []
     no_match_failures: list[str] = []
+    file_errors: list[tuple[str, str | None]] = []
 
     def handle_result(result: JobResult) -> None:
         """Process a single result, logging and tracking failures."""
+        if result.error_code == EXIT_FILE_ERROR:
+            log.error("FAILED: %s (%s)", result.input_path, result.error)
+            file_errors.append((result.input_path, result.error))
+            return
+
         # Log redaction info
         if result.retried_dpi:
             log.info(
@@ -837,18 +1818,73 @@ Config file lookup order:
             log.info("VERIFY OK: %s", result.output_path)
 
     if num_workers == 1:
-        # Sequential processing (no subprocess overhead)
+        # Sequential processing (no subprocess overhead), reusing the grammars
+        # compiled above and one page pool for every file
         _init_worker()  # Still set low priority for single-worker mode
-        for job in job_args:
-            result = _process_single_pdf(job)
-            handle_result(result)
+        executor = _page_executor(patterns, config)
+        with executor or nullcontext():
+            for input_path, output_path in job_paths:
+                try:
+                    result = process_pdf(input_path, output_path, grammars, config, executor)
+                except Exception as e:
+                    result = _file_error(input_path, output_path, e)
+                handle_result(result)
+                if args.fail_fast and verification_failures:
+                    break
     else:
-        # Parallel processing
+        # Parallel processing: report each chunk of files as soon as it's done, in
+        # any order. Several chunks per worker keep the load balanced when file
+        # sizes vary, while large batches of small files avoid a round trip each.
+        chunksize = max(1, len(job_paths) // (num_workers * 4))
+        chunks = (job_paths[i : i + chunksize] for i in range(0, len(job_paths), chunksize))
         with ProcessPoolExecutor(
-            max_workers=num_workers, initializer=_init_worker
+            max_workers=num_workers,
+            initializer=_init_file_worker,
+            initargs=(patterns, config),
         ) as pool:
-            for result in pool.map(_process_single_pdf, job_args):
-                handle_result(result)
+            # Keep only a couple of chunks per worker in flight, topping up as they
+            # finish, so results are dropped once reported however large the batch
+            chunk_of: dict[Future[list[JobResult]], list[tuple[str, str]]] = {}
+
+            def submit(chunk: list[tuple[str, str]]) -> None:
+                try:
+                    future = pool.submit(_process_pdf_batch, chunk)
+                except BrokenExecutor as e:
+                    # A worker died earlier; fail the chunk like one that was running
+                    future = Future()
+                    future.set_exception(e)
+                chunk_of[future] = chunk
+
+            def handle_chunk(future: Future[list[JobResult]]) -> None:
+                chunk = chunk_of.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # The worker crashed or was killed (e.g. out of memory), taking
+                    # the whole chunk with it
+                    results = [
+                        _file_error(input_path, output_path, e) for input_path, output_path in chunk
+                    ]
+                for result in results:
+                    handle_result(result)
+
+            for chunk in itertools.islice(chunks, 2 * num_workers):
+                submit(chunk)
+            while chunk_of:
+                done, pending = wait(chunk_of, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle_chunk(future)
+                if args.fail_fast and verification_failures:
+                    # Don't start any more chunks, but report the ones already
+                    # running: their output files get written either way
+                    for future in pending:
+                        future.cancel()
+                    for future in pending:
+                        if not future.cancelled():
+                            handle_chunk(future)
+                    break
+                for chunk in itertools.islice(chunks, len(done)):
+                    submit(chunk)
 
     # Report and exit with appropriate code
     exit_code = EXIT_SUCCESS
@@ -860,6 +1896,14 @@ Config file lookup order:
             log.error("  %s (%d matches)", path, count)
         exit_code = EXIT_VERIFICATION_FAILED
 
+    if file_errors:
+        log.error("")
+        log.error("Could not process %d file(s):", len(file_errors))
+        for path, error in file_errors:
+            log.error("  %s (%s)", path, error)
+        if exit_code == EXIT_SUCCESS:
+            exit_code = EXIT_FILE_ERROR
+
     if no_match_failures:
         log.warning("")
         log.warning("No matches found in %d file(s):", len(no_match_failures))
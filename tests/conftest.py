@@ -7,13 +7,29 @@ for parameterized redaction testing.
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
+import os
+import pickle
 import random
 import shutil
+from collections import OrderedDict
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 
+# Limit Tesseract's internal threading, once per process and before it first runs
+os.environ["OMP_THREAD_LIMIT"] = "1"
+os.environ["OMP_NUM_THREADS"] = "1"
+
+try:
+    # Faster JSON parsing when installed (it is with the dev extra)
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 # =============================================================================
 # Constants
 # =============================================================================
@@ -22,6 +38,17 @@ DATASET_REPO = "allenai/olmOCR-bench"
 DATASET_DIR = Path(__file__).parent / "olmocr-bench"
 BENCH_DATA_DIR = DATASET_DIR / "bench_data"
 OUTPUT_DIR = Path(__file__).parent / "output"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# Zero-redaction test IDs kept for the summary; the rest are only counted
+ZERO_REDACTION_EXAMPLES = 10
+
+# Page images whose OCR results each worker keeps with --cache-ocr (see cached_ocr)
+OCR_CACHE_SIZE = 64
+
+# Pixels in a PDF's largest page at 300 DPI above which its cases are marked
+# bigmem: more than twice a Letter or A4 page, which a retry at 600 DPI quadruples
+BIGMEM_PIXELS = 20_000_000
 
 # Categories available in the dataset
 CATEGORIES = [
@@ -36,10 +63,10 @@ CATEGORIES = [
 
 # Test types and which fields contain redactable text
 TEXT_FIELDS = {
-    "present": ["text"],
-    "absent": ["text"],
-    "order": ["before", "after"],
-    "table": ["cell", "up", "down", "left", "right", "top_heading", "left_heading"],
+    "present": ("text",),
+    "absent": ("text",),
+    "order": ("before", "after"),
+    "table": ("cell", "up", "down", "left", "right", "top_heading", "left_heading"),
 }
 
 # Default test types to run (skip absent, math, baseline)
@@ -65,7 +92,7 @@ class TestResultTracker:
         # Detailed redaction tracking
         self.with_redactions = 0
         self.zero_redactions = 0
-        self.zero_redaction_tests: list[str] = []
+        self.zero_redaction_tests: list[str] = []  # first ZERO_REDACTION_EXAMPLES only
 
     @property
     def total(self) -> int:
@@ -81,6 +108,9 @@ class TestResultTracker:
 # Global tracker instance (populated by pytest_runtest_logreport)
 _result_tracker = TestResultTracker()
 
+# Controller's cached case list, passed on to xdist workers (see pytest_configure_node)
+_cases_cache_file: Path | None = None
+
 
 # =============================================================================
 # Tesseract Check
@@ -137,51 +167,45 @@ def ensure_dataset() -> None:
 # =============================================================================
 
 
+@functools.cache
 def load_jsonl(path: Path) -> list[dict]:
-    """Load a JSONL file into a list of dicts."""
-    entries = []
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                entries.append(json.loads(line))
-    return entries
+    """Load a JSONL file into a list of dicts (cached; don't modify the result)."""
+    return [json_loads(line) for line in path.read_bytes().splitlines() if line.strip()]
 
 
 def extract_texts(entry: dict) -> list[str]:
     """Extract all redactable text strings from a test entry."""
-    test_type = entry.get("type", "")
-    fields = TEXT_FIELDS.get(test_type, [])
+    fields = TEXT_FIELDS.get(entry.get("type", ""), ())
 
-    texts = []
-    for field in fields:
-        value = entry.get(field)
-        if value and isinstance(value, str):
-            # Skip very short strings (likely noise) and very long ones (performance)
-            if 3 <= len(value) <= 200:
-                texts.append(value)
+    # Skip very short strings (likely noise) and very long ones (performance)
+    return [
+        value
+        for field in fields
+        # JSON parsing only makes exact strs, so skip isinstance's subclass check
+        if type(value := entry.get(field)) is str and 3 <= len(value) <= 200
+    ]
 
-    return texts
 
-
-def load_test_cases(
+def iter_test_cases(
     categories: list[str] | None = None,
     types: list[str] | None = None,
     pdf_filter: str | None = None,
-    limit: int | None = None,
-    sample: int | None = None,
-) -> list[tuple[Path, str, str, str]]:
-    """
-    Load test cases from the dataset.
-
-    Returns list of (pdf_path, text, test_id, test_type) tuples.
-    """
+) -> Iterator[tuple[Path, str, str, str]]:
+    """Yield (pdf_path, text, test_id, test_type) tuples from the dataset, lazily."""
     if categories is None:
         categories = CATEGORIES
-    if types is None:
-        types = DEFAULT_TYPES
+    wanted_types = set(types if types is not None else DEFAULT_TYPES)
 
-    cases: list[tuple[Path, str, str, str]] = []
+    # List the PDFs once instead of checking each entry's file
+    pdfs_dir = BENCH_DATA_DIR / "pdfs"
+    available_pdfs = {
+        os.path.relpath(os.path.join(root, name), pdfs_dir)
+        for root, _, names in os.walk(pdfs_dir)
+        for name in names
+    }
+
+    # One Path per PDF, shared by all its cases (and kept shared when pickled)
+    pdf_paths: dict[str, Path] = {}
 
     for category in categories:
         jsonl_path = BENCH_DATA_DIR / f"{category}.jsonl"
@@ -197,19 +221,20 @@ def load_test_cases(
 
             # Filter by test type
             test_type = entry.get("type", "unknown")
-            if test_type not in types:
+            if test_type not in wanted_types:
                 continue
 
             # Apply PDF filter
             if pdf_filter and pdf_filter not in pdf_name:
                 continue
 
-            pdf_path = BENCH_DATA_DIR / "pdfs" / pdf_name
-            if not pdf_path.exists():
+            texts = extract_texts(entry)
+            if not texts or os.path.normpath(pdf_name) not in available_pdfs:
                 continue
-
+            pdf_path = pdf_paths.get(pdf_name)
+            if pdf_path is None:
+                pdf_path = pdf_paths[pdf_name] = pdfs_dir / pdf_name
             test_id_base = entry.get("id", pdf_name)
-            texts = extract_texts(entry)
 
             for i, text in enumerate(texts):
                 test_id = (
@@ -217,14 +242,113 @@ def load_test_cases(
                     if len(texts) > 1
                     else f"{category}/{test_id_base}"
                 )
-                cases.append((pdf_path, text, test_id, test_type))
+                yield (pdf_path, text, test_id, test_type)
+
+
+@functools.cache
+def is_bigmem(pdf_path: Path) -> bool:
+    """Whether a PDF has a page large enough to need far more memory than usual."""
+    import fitz
+
+    from bleachpdf import _max_pixels_for_doc
+
+    try:
+        with fitz.open(pdf_path) as doc:
+            return _max_pixels_for_doc(doc, 300) > BIGMEM_PIXELS
+    except Exception:
+        # Unreadable PDFs fail in the test itself
+        return False
+
+
+def _cases_cache_path(
+    categories: list[str] | None, types: list[str] | None, pdf_filter: str | None
+) -> Path:
+    """
+    Path of the cached case list for these filters and the current dataset.
+
+    The key covers the dataset's location, since cases hold absolute paths, the
+    JSONL files with their mtimes, and the mtimes of the PDF directories, which
+    change whenever a PDF is added, removed or renamed (cases are dropped for
+    missing PDFs). Only directories are stat'ed, not each of the thousands of PDFs.
+    Moving the checkout or changing the dataset starts a new cache.
+    """
+    jsonl_stamps = sorted((p.name, p.stat().st_mtime_ns) for p in BENCH_DATA_DIR.glob("*.jsonl"))
+    pdfs_dir = BENCH_DATA_DIR / "pdfs"
+    dir_stamps = sorted(
+        (os.path.relpath(root, pdfs_dir), os.stat(root).st_mtime_ns)
+        for root, _, _ in os.walk(pdfs_dir)
+    )
+    key = repr(
+        (
+            str(BENCH_DATA_DIR.resolve()),
+            categories,
+            types,
+            pdf_filter,
+            jsonl_stamps,
+            dir_stamps,
+        )
+    )
+    return CACHE_DIR / f"cases-{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+
+
+def cached_test_cases(
+    categories: list[str] | None = None,
+    types: list[str] | None = None,
+    pdf_filter: str | None = None,
+    path: Path | None = None,
+) -> list[tuple[Path, str, str, str]]:
+    """
+    Return the test cases for these filters, from the cache if present.
+
+    The controller fills the cache in pytest_configure, so that xdist workers
+    unpickle one file instead of each re-reading the dataset.
+    It also passes them the cache's path, so they needn't work it out again.
+
+    Returns (pdf_path, text, test_id, test_type) tuples.
+    """
+    if path is None:
+        path = _cases_cache_path(categories, types, pdf_filter)
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    cases = list(iter_test_cases(categories, types, pdf_filter))
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Write under a unique name and rename, so readers never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(cases, f)
+    os.replace(tmp_path, path)
+    return cases
+
+
+def load_test_cases(
+    categories: list[str] | None = None,
+    types: list[str] | None = None,
+    pdf_filter: str | None = None,
+    limit: int | None = None,
+    sample: int | None = None,
+    seed: int = 0,
+    cases_cache: Path | None = None,
+) -> list[tuple[Path, str, str, str]]:
+    """
+    Load test cases from the dataset, or the cases_cache file if given.
+
+    A sample is drawn with a seeded generator, so that every xdist worker
+    collects the same cases.
+
+    Returns list of (pdf_path, text, test_id, test_type) tuples.
+    """
+    cases = cached_test_cases(categories, types, pdf_filter, cases_cache)
 
     # Apply sampling
-    if sample and sample < len(cases):
-        cases = random.sample(cases, sample)
+    if sample:
+        cases = random.Random(seed).sample(cases, min(sample, len(cases)))
 
     # Apply limit
-    if limit and limit < len(cases):
+    if limit:
         cases = cases[:limit]
 
     return cases
@@ -239,17 +363,29 @@ def pytest_xdist_auto_num_workers(config: pytest.Config) -> int:
     """
     Return number of workers for pytest-xdist when -n auto is used.
 
-    Default: half the CPU cores.
-    Override with --jobs N.
+    Default: one per physical CPU core, since OCR gains little from SMT siblings.
+    Without psutil, half the logical cores as an estimate.
+    Override with --jobs N or the PYTEST_XDIST_AUTO_NUM_WORKERS environment variable.
     """
-    import os
-
     # Check if user specified --jobs
     jobs = config.getoption("--jobs", default=None)
     if jobs is not None:
         return jobs
 
-    # Default: half the CPU cores, minimum 1
+    env_workers = _env_int("PYTEST_XDIST_AUTO_NUM_WORKERS", 0)
+    if env_workers:
+        return max(1, env_workers)
+
+    try:
+        import psutil
+
+        physical = psutil.cpu_count(logical=False)
+    except ImportError:
+        physical = None
+    if physical:
+        return physical
+
+    # Fallback: half the logical cores, minimum 1
     cpu_count = os.cpu_count() or 1
     return max(1, cpu_count // 2)
 
@@ -281,6 +417,14 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         default=None,
         help="Randomly sample N test cases",
     )
+    parser.addoption(
+        "--sample-seed",
+        action="store",
+        type=int,
+        default=None,
+        help="Random seed for --sample; change it to draw a different sample "
+        "(default: $BLEACHPDF_SAMPLE_SEED, or 0)",
+    )
     parser.addoption(
         "--limit",
         action="store",
@@ -312,7 +456,7 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         action="store",
         type=int,
         default=None,
-        help="Number of parallel workers (default: half the CPU cores)",
+        help="Number of parallel workers (default: one per physical CPU core)",
     )
     parser.addoption(
         "--lang",
@@ -320,21 +464,69 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         default="eng",
         help="Tesseract language(s) for OCR, e.g. 'eng', 'eng+kor' (default: eng)",
     )
+    parser.addoption(
+        "--cache-ocr",
+        action="store_true",
+        default=False,
+        help="Reuse OCR results for identical page images across cases for the same PDF "
+        "(faster, but bypasses bleachpdf's own OCR call for repeated pages)",
+    )
+
+
+def _runs_redaction_tests(config: pytest.Config) -> bool:
+    """
+    Whether the paths given to pytest may include test_redaction.py.
+
+    Other test modules, such as test_grammar.py, need neither Tesseract nor the dataset.
+    """
+    for arg in config.args:
+        path = Path(arg.split("::")[0])
+        if path.suffix != ".py" or path.name == "test_redaction.py":
+            return True
+    return False
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, rejecting anything else."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise pytest.UsageError(f"{name} must be an integer, got {value!r}") from None
 
 
 def pytest_configure(config: pytest.Config) -> None:
     """Run setup checks before tests."""
-    # Only run on controller (not workers)
-    if hasattr(config, "workerinput"):
+    config.addinivalue_line(
+        "markers", "bigmem: case whose PDF has very large pages (see BIGMEM_PIXELS)"
+    )
+    if config.option.sample_seed is None:
+        config.option.sample_seed = _env_int("BLEACHPDF_SAMPLE_SEED", 0)
+
+    # Only run on controller (not workers), and only if redaction tests may run
+    if hasattr(config, "workerinput") or not _runs_redaction_tests(config):
         return
 
+    global _cases_cache_file
+
     check_tesseract()
     ensure_dataset()
+    filters = _filter_options(config)
+    _cases_cache_file = _cases_cache_path(*filters)
+    cached_test_cases(*filters, path=_cases_cache_file)
 
     # Store threshold for later use
     _result_tracker.threshold = config.getoption("--pass-threshold")
 
 
+def pytest_configure_node(node) -> None:
+    """Tell each xdist worker where the controller cached the test cases."""
+    if _cases_cache_file is not None:
+        node.workerinput["cases_cache"] = str(_cases_cache_file)
+
+
 def pytest_runtest_logreport(report: pytest.TestReport) -> None:
     """
     Aggregate test results from reports.
@@ -370,7 +562,8 @@ def pytest_runtest_logreport(report: pytest.TestReport) -> None:
         _result_tracker.with_redactions += 1
     else:
         _result_tracker.zero_redactions += 1
-        _result_tracker.zero_redaction_tests.append(test_id)
+        if len(_result_tracker.zero_redaction_tests) < ZERO_REDACTION_EXAMPLES:
+            _result_tracker.zero_redaction_tests.append(test_id)
 
 
 def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:  # noqa: ARG001
@@ -400,11 +593,11 @@ def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:  # n
 
     if tracker.zero_redaction_tests:
         print()
-        print("  Zero-redaction tests (first 10):")
-        for test_id in tracker.zero_redaction_tests[:10]:
+        print(f"  Zero-redaction tests (first {ZERO_REDACTION_EXAMPLES}):")
+        for test_id in tracker.zero_redaction_tests:
             print(f"    - {test_id}")
-        if len(tracker.zero_redaction_tests) > 10:
-            print(f"    ... and {len(tracker.zero_redaction_tests) - 10} more")
+        if tracker.zero_redactions > len(tracker.zero_redaction_tests):
+            print(f"    ... and {tracker.zero_redactions - len(tracker.zero_redaction_tests)} more")
 
     if tracker.threshold > 0:
         print()
@@ -420,31 +613,20 @@ def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:  # n
     print("=" * 70)
 
 
+# Characters that need escaping in regex, mapped to their escaped form
+_PEG_ESCAPE_TABLE = str.maketrans({c: f"\\{c}" for c in r"\.^$*+?{}[]|()"})
+
+
 def escape_peg_regex(s: str) -> str:
     """Escape special regex characters for use in PEG pattern."""
-    # Characters that need escaping in regex
-    special = r"\.^$*+?{}[]|()"
-    result = []
-    for c in s:
-        if c in special:
-            result.append(f"\\{c}")
-        else:
-            result.append(c)
-    return "".join(result)
+    return s.translate(_PEG_ESCAPE_TABLE)
 
 
-def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
-    """Generate test cases dynamically for parametrized redaction tests."""
-    if "redaction_case" not in metafunc.fixturenames:
-        return
-
-    # Get filter options from pytest config
-    config = metafunc.config
+def _filter_options(config: pytest.Config) -> tuple[list[str] | None, list[str] | None, str | None]:
+    """Return the (categories, types, pdf_filter) test case filters from pytest config."""
     pdf_filter = config.getoption("--pdf")
     category_opt = config.getoption("--category")
     types_opt = config.getoption("--types")
-    sample = config.getoption("--sample")
-    limit = config.getoption("--limit")
 
     categories = None
     if category_opt:
@@ -454,6 +636,23 @@ def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
     if types_opt:
         types = [t.strip() for t in types_opt.split(",")]
 
+    return categories, types, pdf_filter
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    """Generate test cases dynamically for parametrized redaction tests."""
+    if "redaction_case" not in metafunc.fixturenames:
+        return
+
+    # Get filter options from pytest config
+    config = metafunc.config
+    categories, types, pdf_filter = _filter_options(config)
+    sample = config.getoption("--sample")
+    seed = config.getoption("--sample-seed")
+    limit = config.getoption("--limit")
+    # From the controller: passed to xdist workers, or set in this process without xdist
+    cases_cache = getattr(config, "workerinput", {}).get("cases_cache") or _cases_cache_file
+
     # Load test cases
     cases = load_test_cases(
         categories=categories,
@@ -461,6 +660,8 @@ def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
         pdf_filter=pdf_filter,
         limit=limit,
         sample=sample,
+        seed=seed,
+        cases_cache=Path(cases_cache) if cases_cache else None,
     )
 
     if not cases:
@@ -468,7 +669,66 @@ def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
         metafunc.parametrize("redaction_case", [], ids=[])
         return
 
-    # Create readable test IDs from the test_id field
-    ids = [case[2] for case in cases]  # case[2] is test_id
+    # Keep cases for the same PDF together, and with --dist loadgroup on the same
+    # worker, so cached_ocr can reuse its OCR results
+    cases.sort(key=lambda case: str(case[0]))
+    params = [
+        # Readable test IDs from the test_id field; bigmem cases can be run
+        # separately with fewer workers (-m bigmem). Only the PDFs of the selected
+        # cases are opened to check, each once per process.
+        pytest.param(
+            (pdf_path, text, test_id, test_type),
+            id=test_id,
+            marks=[pytest.mark.xdist_group(str(pdf_path))]
+            + ([pytest.mark.bigmem] if is_bigmem(pdf_path) else []),
+        )
+        for pdf_path, text, test_id, test_type in cases
+    ]
+
+    metafunc.parametrize("redaction_case", params)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cached_ocr(request: pytest.FixtureRequest) -> Iterator[None]:
+    """
+    With --cache-ocr, reuse OCR results for identical page images within a worker.
+
+    Every case for a PDF renders the same unredacted pages, so only the first one
+    needs to OCR them. Redacted pages differ from the originals, so verification
+    still OCRs each test's own output.
 
-    metafunc.parametrize("redaction_case", cases, ids=ids)
+    Results are keyed on everything Tesseract sees: the pixels, size, mode and
+    resolution of the image, the language and page segmentation mode, and whether
+    tesserocr or the tesseract command runs it.
+    """
+    if not request.config.getoption("--cache-ocr"):
+        yield
+        return
+
+    import bleachpdf
+
+    ocr_page = bleachpdf.ocr_page
+    cache: OrderedDict[tuple, list[bleachpdf.Word]] = OrderedDict()
+
+    def cached_ocr_page(img, config):
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16).digest()
+        key = (
+            digest,
+            img.size,
+            img.mode,
+            img.info.get("dpi"),
+            config.lang,
+            config.psm,
+            bleachpdf._tesserocr_api(config.lang, config.psm) is not None,
+        )
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            cache[key] = ocr_page(img, config)
+            if len(cache) > OCR_CACHE_SIZE:
+                cache.popitem(last=False)
+        return list(cache[key])
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(bleachpdf, "ocr_page", cached_ocr_page)
+        yield
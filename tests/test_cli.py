@@ -0,0 +1,331 @@
+"""
+Tests for the bleachpdf command line, independent of Tesseract and the olmOCR-bench dataset.
+
+The PDFs are generated, and OCR is replaced by a stand-in that reads a gray box
+as the word SECRET, so these check what ends up in the output files: which
+pages are images, how they're encoded, and that nothing is left visible.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+from glob import glob
+
+import fitz
+import pytest
+from PIL import ImageFilter
+
+import bleachpdf
+from bleachpdf import (
+    EXIT_FILE_ERROR,
+    EXIT_VERIFICATION_FAILED,
+    Config,
+    Word,
+    compile_grammars,
+    redact_pdf,
+)
+
+# Where the word SECRET is drawn, as a dark gray box (gray level 77)
+SECRET_RECT = fitz.Rect(40, 100, 140, 130)
+SECRET_GRAY = 0.3
+SECRET_PATTERN = 'match = "SECRET"'
+DPI = "100"
+
+# Stubs set up in this process only reach -j workers that are forked from it
+needs_fork = pytest.mark.skipif(
+    multiprocessing.get_all_start_methods()[0] != "fork",
+    reason="worker processes aren't forked on this platform",
+)
+
+
+def fake_ocr_page(img, config):
+    """Read any dark gray box still visible on a page as the word SECRET."""
+    mask = img.convert("L").point(lambda v: 255 if 50 <= v <= 110 else 0)
+    # Wear away thin edges, e.g. of antialiased text or around a redaction
+    bbox = mask.filter(ImageFilter.MinFilter(5)).getbbox()
+    if bbox is None:
+        return []
+    left, top, right, bottom = bbox
+    return [Word(text="SECRET", left=left, top=top, width=right - left, height=bottom - top)]
+
+
+@pytest.fixture(autouse=True)
+def fake_ocr(monkeypatch):
+    """Use fake_ocr_page instead of Tesseract, and keep main's log handlers out of later tests."""
+    monkeypatch.setattr(bleachpdf, "ocr_page", fake_ocr_page)
+    monkeypatch.setattr(bleachpdf.log, "handlers", [])
+
+
+def make_pdf(path, secret_pages, pages=3, size=200) -> str:
+    """Write a PDF with some text on every page, and SECRET on the given ones."""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page(width=size, height=size)
+        page.insert_text((20, 40), f"public text {page_num}", fontsize=11)
+        if page_num in secret_pages:
+            page.draw_rect(SECRET_RECT, color=(SECRET_GRAY,) * 3, fill=(SECRET_GRAY,) * 3)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def run_bleachpdf(monkeypatch, *args) -> int:
+    """Run the command line with args, returning its exit code."""
+    monkeypatch.setattr(sys, "argv", ["bleachpdf", *args])
+    try:
+        bleachpdf.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def make_batch(directory, files) -> str:
+    """Write files PDFs with SECRET on every page to a directory, for batch runs."""
+    directory.mkdir()
+    for i in range(files):
+        make_pdf(directory / f"doc{i:02}.pdf", secret_pages={0, 1, 2})
+    return str(directory)
+
+
+def logged(caplog, prefix) -> list[str]:
+    """Messages bleachpdf logged starting with prefix."""
+    return [r.getMessage() for r in caplog.records if r.getMessage().startswith(prefix)]
+
+
+def page_images(page) -> list[int]:
+    """xrefs of the images on a page."""
+    return [image[0] for image in page.get_images()]
+
+
+def image_channels(doc, page) -> list[int]:
+    """Number of color channels of each image on a page."""
+    return [fitz.Pixmap(doc, xref).n for xref in page_images(page)]
+
+
+def assert_redacted(path) -> None:
+    """Check no SECRET is visible on any page of a PDF."""
+    with fitz.open(path) as doc:
+        for page in doc:
+            pix = page.get_pixmap(dpi=int(DPI))
+            img = bleachpdf._image_from_samples(pix.samples, pix.width, pix.height, "RGB")
+            assert fake_ocr_page(img, None) == [], f"SECRET visible on page {page.number}"
+
+
+def test_redacts_every_page_to_an_image(tmp_path, monkeypatch):
+    """By default every page becomes an image, and the secret is covered."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages={1})
+    output = str(tmp_path / "out.pdf")
+
+    args = [source, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "1"]
+    assert run_bleachpdf(monkeypatch, *args) == 0
+
+    with fitz.open(output) as doc:
+        assert doc.page_count == 3
+        for page in doc:
+            assert page.get_text() == ""
+            assert len(page_images(page)) == 1
+    assert_redacted(output)
+
+
+def test_keep_unredacted_pages(tmp_path, monkeypatch):
+    """--keep-unredacted-pages copies pages without matches, text layer included."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages={1})
+    output = str(tmp_path / "out.pdf")
+
+    args = [source, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "1"]
+    assert run_bleachpdf(monkeypatch, *args, "--keep-unredacted-pages") == 0
+
+    with fitz.open(output) as doc:
+        assert doc.page_count == 3
+        assert "public text 0" in doc[0].get_text()
+        assert doc[1].get_text() == ""
+        assert "public text 2" in doc[2].get_text()
+    assert_redacted(output)
+
+
+def test_grayscale(tmp_path, monkeypatch):
+    """--grayscale embeds single-channel page images."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages={0})
+    output = str(tmp_path / "out.pdf")
+
+    args = [source, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "1"]
+    assert run_bleachpdf(monkeypatch, *args, "--grayscale") == 0
+
+    with fitz.open(output) as doc:
+        for page in doc:
+            assert image_channels(doc, page) == [1]
+    assert_redacted(output)
+
+
+def test_jpeg(tmp_path, monkeypatch):
+    """--jpeg embeds page images as JPEG."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages={0})
+    output = str(tmp_path / "out.pdf")
+
+    args = [source, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "1"]
+    assert run_bleachpdf(monkeypatch, *args, "--jpeg", "80") == 0
+
+    with fitz.open(output) as doc:
+        for page in doc:
+            (xref,) = page_images(page)
+            assert doc.xref_get_key(xref, "Filter") == ("name", "/DCTDecode")
+    assert_redacted(output)
+
+
+def test_crop_margins(tmp_path, monkeypatch):
+    """--crop-margins keeps the page size, with an image only where there's content."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages={0})
+    output = str(tmp_path / "out.pdf")
+
+    args = [source, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "1"]
+    assert run_bleachpdf(monkeypatch, *args, "--crop-margins") == 0
+
+    with fitz.open(output) as doc:
+        assert doc.page_count == 3
+        for page in doc:
+            assert page.rect == fitz.Rect(0, 0, 200, 200)
+            (xref,) = page_images(page)
+            (image_rect,) = page.get_image_rects(xref)
+            assert page.rect.contains(image_rect)
+            assert image_rect.get_area() < page.rect.get_area() / 2
+    assert_redacted(output)
+
+
+def test_no_output_without_redactions(tmp_path):
+    """Without write_unredacted, nothing is written when nothing is redacted."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages=set())
+    output = tmp_path / "out.pdf"
+    grammars = compile_grammars([SECRET_PATTERN])
+
+    assert redact_pdf(source, str(output), grammars, Config(dpi=100), write_unredacted=False) == 0
+    assert not output.exists()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"grayscale": True}, {"crop_margins": True}, {"keep_unredacted": True}],
+    ids=["default", "grayscale", "crop_margins", "keep_unredacted"],
+)
+def test_deferred_output(tmp_path, options):
+    """Pages before the first redaction are written just as they would be otherwise."""
+    source = make_pdf(tmp_path / "in.pdf", secret_pages={2}, pages=4)
+    grammars = compile_grammars([SECRET_PATTERN])
+    config = Config(dpi=100, **options)
+
+    outputs = []
+    for write_unredacted in (True, False):
+        output = str(tmp_path / f"out_{write_unredacted}.pdf")
+        assert redact_pdf(source, output, grammars, config, write_unredacted=write_unredacted) == 1
+        outputs.append(output)
+
+    with fitz.open(outputs[0]) as expected, fitz.open(outputs[1]) as deferred:
+        assert deferred.page_count == expected.page_count == 4
+        for expected_page, deferred_page in zip(expected, deferred):
+            assert deferred_page.get_text() == expected_page.get_text()
+            assert deferred_page.get_pixmap().samples == expected_page.get_pixmap().samples
+            # The same kind of image, e.g. still grayscale
+            assert image_channels(deferred, deferred_page) == image_channels(
+                expected, expected_page
+            )
+    assert_redacted(outputs[1])
+
+
+@pytest.mark.parametrize("jobs", ["1", pytest.param("2", marks=needs_fork)])
+def test_file_error(tmp_path, monkeypatch, caplog, jobs):
+    """A file that can't be opened fails on its own; the rest of the batch is written."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    # Enough files for -j 2 to send them to workers in chunks of two
+    inputs = make_batch(tmp_path / "in", files=15)
+    (tmp_path / "in" / "corrupt.pdf").write_bytes(b"not a PDF")
+    output = str(tmp_path / "out") + "/"
+
+    args = [inputs, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", jobs]
+    assert run_bleachpdf(monkeypatch, *args) == EXIT_FILE_ERROR
+
+    (failed,) = logged(caplog, "FAILED: ")
+    assert "corrupt.pdf" in failed
+    written = sorted(os.listdir(output))
+    assert written == [f"doc{i:02}.pdf" for i in range(15)]
+    for name in written:
+        assert_redacted(os.path.join(output, name))
+
+
+@needs_fork
+def test_worker_crash(tmp_path, monkeypatch, caplog):
+    """Files lost with a worker process that dies are reported, not fatal to the batch."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    process_single_pdf = bleachpdf._process_single_pdf
+
+    def crash_on_doc00(args):
+        if args[0].endswith("doc00.pdf"):
+            os._exit(1)
+        return process_single_pdf(args)
+
+    monkeypatch.setattr(bleachpdf, "_process_single_pdf", crash_on_doc00)
+    inputs = make_batch(tmp_path / "in", files=4)
+    output = str(tmp_path / "out") + "/"
+
+    args = [inputs, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "2"]
+    assert run_bleachpdf(monkeypatch, *args) == EXIT_FILE_ERROR
+
+    failed = logged(caplog, "FAILED: ")
+    assert any("doc00.pdf" in message for message in failed)
+    assert all("BrokenProcessPool" in message for message in failed)
+    # Every file is either written or reported (the pool can take all of them down)
+    written = set(os.listdir(output)) if os.path.isdir(output) else set()
+    for i in range(4):
+        name = f"doc{i:02}.pdf"
+        assert name in written or any(name in message for message in failed)
+
+
+@needs_fork
+def test_fail_fast(tmp_path, monkeypatch, caplog):
+    """--fail-fast starts no more files after a leak, but reports the ones it wrote."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    # Leave everything visible, so every file fails verification
+    monkeypatch.setattr(bleachpdf, "_draw_redactions", lambda img, boxes: None)
+    inputs = make_batch(tmp_path / "in", files=12)
+    output = str(tmp_path / "out") + "/"
+
+    args = [inputs, "-o", output, "-m", "SECRET", "--dpi", DPI, "-j", "2", "--fail-fast"]
+    assert run_bleachpdf(monkeypatch, *args) == EXIT_VERIFICATION_FAILED
+
+    written = sorted(os.listdir(output))
+    assert 0 < len(written) < 12
+    reported = logged(caplog, "VERIFY FAILED: ")
+    assert sorted(os.path.basename(message.split()[2]) for message in reported) == written
+
+
+def test_worker_memory(tmp_path, monkeypatch, caplog):
+    """The default worker count leaves memory for the largest input's pages."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    inputs = sorted(glob(os.path.join(make_batch(tmp_path / "in", files=10), "*.pdf")))
+    # Given last, but the largest file, with pages twenty times the area
+    big = make_pdf(tmp_path / "big.pdf", secret_pages=range(12), pages=12, size=900)
+    assert all(os.path.getsize(big) > os.path.getsize(path) for path in inputs)
+    # Room for the pages of one worker, but not two
+    big_page = bleachpdf._page_memory([big], int(DPI), grayscale=False)
+    monkeypatch.setattr(bleachpdf, "_available_memory", lambda: big_page * 3 // 2)
+    output = str(tmp_path / "out") + "/"
+
+    args = [*inputs, big, "-o", output, "-m", "SECRET", "--dpi", DPI, "-v"]
+    assert run_bleachpdf(monkeypatch, *args) == 0
+    assert logged(caplog, "Processing 11 file(s) with 1 worker(s), 1 page worker(s) each")
+
+
+@pytest.mark.parametrize(
+    "cpus, options", [(1, []), (4, ["-j", "1"])], ids=["one_cpu", "jobs_given"]
+)
+def test_worker_memory_skipped(tmp_path, monkeypatch, cpus, options):
+    """No input is opened to estimate memory when the worker count can't be capped."""
+    monkeypatch.setattr(os, "cpu_count", lambda: cpus)
+    estimated = []
+    monkeypatch.setattr(bleachpdf, "_page_memory", lambda *args: estimated.append(args) or 0)
+    inputs = make_batch(tmp_path / "in", files=2)
+    output = str(tmp_path / "out") + "/"
+
+    args = [inputs, "-o", output, "-m", "SECRET", "--dpi", DPI, *options]
+    assert run_bleachpdf(monkeypatch, *args) == 0
+    assert estimated == []
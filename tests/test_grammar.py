@@ -0,0 +1,130 @@
+"""
+Tests for pattern matching, independent of OCR and the olmOCR-bench dataset.
+
+find_matches skips the grammar for a regex translation or a folded literal when
+it can. A mistranslation means text silently goes unredacted, so these compare
+it against the grammar itself tried at every position, as parsimonious sees it.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from dataclasses import replace
+
+import pytest
+
+from bleachpdf import CompiledGrammar, TextStream, compile_grammars, find_matches
+
+# Patterns from the README and the shapes -m and the test suite build
+EXAMPLE_PATTERNS = [
+    'match = "123456789"',
+    'match = d d d d d d d d d\nd = ~"[0-9]"',
+    'match = "ACCT" d d d d\nd = ~"[0-9]"',
+    'match = "ACCT" d+\nd = ~"[0-9]"',
+    'match = ~"johndoe"i',
+    'match = ~"(?i)johndoe"',
+    'match = ~"(?i)123mainst(reet)?"',
+    'match = ~"k"i',
+    'match = ~"(?i)ss"',
+    'match = d+ "x"\nd = ~"[0-9]"',
+    'match = ("ab" / "a") "b"',
+    'match = ("a" / "b")+ "c"',
+    'match = "a"* "b"',
+    'match = !"ab" ~"[a-z]" ~"[0-9]"+',
+    'match = &"a" ~"[a-z]+"',
+    'match = ~"a*"',
+    'match = ~"[0-9]{2,3}" "a"?',
+    'match = x / y\nx = "ab" "c"\ny = "a" ~"b+"',
+    'match = "a" match / "b"',
+    'match = ~"a(b)\\\\1"',
+    'match = ~"[0-9]+" ~"[0-9]"',
+    'match = "" "a"',
+    'match = ~"(?i)a" ~"b"',
+]
+
+# Characters for random texts, including ones that change length or case oddly
+EXAMPLE_ALPHABET = "ab c1234567890ACCTxkKSsJohnDoeKſ"
+
+# Building blocks for random grammars; r2 is a second rule they can refer to
+FUZZ_ATOMS = ['"a"', '"b"', '"ab"', '""', '~"[ab]"', '~"a*"', '~"b?"', '~"(?i)A"', '~"ba|b"', "r2"]
+FUZZ_GRAMMARS = 300
+FUZZ_TEXTS = 50
+
+
+def grammar_only(compiled: CompiledGrammar) -> CompiledGrammar:
+    """The same grammar with every shortcut off, so it is tried at every position."""
+    return replace(compiled, regex=None, leads=None, min_length=0, required=(), folded_literal=None)
+
+
+def assert_same_matches(pattern: str, texts: list[str]) -> None:
+    """Check find_matches gives the same words with and without its shortcuts."""
+    grammars = compile_grammars([pattern])
+    assert grammars, f"pattern failed to compile: {pattern!r}"
+    reference = [grammar_only(compiled) for compiled in grammars]
+
+    for text in texts:
+        # One word per character, so the matched words are the matched positions
+        stream = TextStream(text=text, word_map=tuple(range(len(text))))
+        assert find_matches(stream, grammars) == find_matches(stream, reference), (
+            f"{pattern!r} on {text!r}"
+        )
+
+
+def random_grammar(rng: random.Random, depth: int) -> str:
+    """Build a random PEG expression from FUZZ_ATOMS."""
+    if depth <= 0 or rng.random() < 0.3:
+        return rng.choice(FUZZ_ATOMS)
+    kind = rng.random()
+    if kind < 0.3:
+        return (
+            "(" + " ".join(random_grammar(rng, depth - 1) for _ in range(rng.randint(2, 3))) + ")"
+        )
+    if kind < 0.55:
+        members = (random_grammar(rng, depth - 1) for _ in range(rng.randint(2, 3)))
+        return "(" + " / ".join(members) + ")"
+    if kind < 0.75:
+        return random_grammar(rng, depth - 1) + rng.choice(["*", "+", "?", "{2}", "{1,2}", "{0,3}"])
+    if kind < 0.9:
+        return rng.choice(["!", "&"]) + random_grammar(rng, depth - 1)
+    return random_grammar(rng, depth - 1)
+
+
+@pytest.mark.parametrize("pattern", EXAMPLE_PATTERNS)
+def test_example_patterns(pattern):
+    """Example patterns match the same words as their grammars on random texts."""
+    rng = random.Random(pattern)
+    texts = [
+        "".join(rng.choice(EXAMPLE_ALPHABET) for _ in range(rng.randint(0, 25))) for _ in range(500)
+    ]
+    texts += ["123456789", "ACCT1234x", "JohnDoe", "johndoe123mainstreet", "SSK"]
+    assert_same_matches(pattern, texts)
+
+
+def test_translated_grammars():
+    """Grammars translated to regexes match the same words as parsimonious does."""
+    rng = random.Random(0)
+    translated = 0
+    for _ in range(FUZZ_GRAMMARS):
+        pattern = f'match = {random_grammar(rng, 3)}\nr2 = "b" "a"*'
+        grammars = compile_grammars([pattern])
+        if not grammars:
+            # Random expressions can be invalid, e.g. with stacked quantifiers
+            continue
+        texts = [
+            "".join(rng.choice("abAB") for _ in range(rng.randint(0, 12)))
+            for _ in range(FUZZ_TEXTS)
+        ]
+        assert_same_matches(pattern, texts)
+        translated += grammars[0].regex is not None
+
+    # Make sure the regex path was actually exercised
+    if sys.version_info >= (3, 11):
+        assert translated > FUZZ_GRAMMARS // 4
+
+
+def test_folded_literal():
+    """Case-insensitive literals use str.find on ASCII text, and the regex otherwise."""
+    (compiled,) = compile_grammars(['match = ~"(?i)johndoe"'])
+    assert compiled.folded_literal == "johndoe"
+    assert_same_matches('match = ~"(?i)johndoe"', ["xJOHNDOEjohndoe", "JöhnDoe JohnDoe"])
@@ -7,10 +7,13 @@ into progress as tests run.
 
 from __future__ import annotations
 
+import functools
 import os
 import tempfile
 from pathlib import Path
 
+import fitz
+
 from bleachpdf import Config, _process_single_pdf, normalize
 
 from .conftest import (
@@ -18,6 +21,27 @@ from .conftest import (
     escape_peg_regex,
 )
 
+OUTPUT_DIR_STR = str(OUTPUT_DIR)
+
+
+@functools.cache
+def ensure_dir(path: str) -> None:
+    """Create a directory, once per worker rather than once per test case."""
+    os.makedirs(path, exist_ok=True)
+
+
+@functools.cache
+def build_pattern(text: str) -> str:
+    """Build the case-insensitive PEG pattern for a text (cached, as texts repeat)."""
+    escaped = escape_peg_regex(normalize(text))
+    return f'match = ~"(?i){escaped}"'
+
+
+def count_pages(path: str) -> int:
+    """Number of pages in a PDF."""
+    with fitz.open(path) as doc:
+        return doc.page_count
+
 
 def run_redaction_test(
     pdf_path: Path,
@@ -31,38 +55,33 @@ def run_redaction_test(
 
     Returns dict with result details for tracking.
     """
-    # Build pattern from text
-    pattern = normalize(text)
-    escaped = escape_peg_regex(pattern)
-    peg_pattern = f'match = ~"(?i){escaped}"'
+    peg_pattern = build_pattern(text)
 
-    # Determine output path
+    # Determine output path (kept as a str, which is what bleachpdf takes)
     if save_output:
-        output_path = OUTPUT_DIR / f"{test_id}.pdf"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path = os.path.join(OUTPUT_DIR_STR, f"{test_id}.pdf")
+        ensure_dir(os.path.dirname(output_path))
     else:
         # Use temp file
-        fd, tmp_path = tempfile.mkstemp(suffix=".pdf", prefix="bleachpdf_test_")
+        fd, output_path = tempfile.mkstemp(suffix=".pdf", prefix="bleachpdf_test_")
         os.close(fd)
-        output_path = Path(tmp_path)
-
-    # Limit Tesseract's internal threading
-    os.environ["OMP_THREAD_LIMIT"] = "1"
 
     # Run bleachpdf
     config = Config(dpi=300, lang=lang, verify=True)
-    result = _process_single_pdf(
-        (
-            str(pdf_path),
-            str(output_path),
-            [peg_pattern],
-            config,
+    try:
+        result = _process_single_pdf(
+            (
+                str(pdf_path),
+                output_path,
+                [peg_pattern],
+                config,
+            )
         )
-    )
-
-    # Clean up temp file if not saving
-    if not save_output and output_path.exists():
-        output_path.unlink()
+        output_pages = count_pages(output_path)
+    finally:
+        # Clean up temp file if not saving
+        if not save_output and os.path.exists(output_path):
+            os.unlink(output_path)
 
     return {
         "test_id": test_id,
@@ -70,6 +89,8 @@ def run_redaction_test(
         "output_path": result.output_path,
         "redactions": result.redactions,
         "leaked": result.leaked,
+        "input_pages": count_pages(str(pdf_path)),
+        "output_pages": output_pages,
         "passed": result.leaked == 0,
     }
 
@@ -93,6 +114,11 @@ def test_redaction(redaction_case, request):
     request.node.user_properties.append(("leaked", result["leaked"]))
     request.node.user_properties.append(("test_id", test_id))
 
+    # Every input page made it into the output PDF
+    assert result["output_pages"] == result["input_pages"], (
+        f"Output has {result['output_pages']} pages, input has {result['input_pages']}"
+    )
+
     # Assert verification passed (no text leaked)
     assert result["leaked"] == 0, (
         f"Verification failed: {result['leaked']} matches still visible after redaction"